@@ -36,6 +36,20 @@ String instrucaoinicial;
 String instrucaoFinal;
 char estadoBtns[11];
 
+// ========== PROTOCOLO BINÁRIO (ver communication.py)
+// Quadro de 5 bytes: [início][sequência][comando][dado][checksum], checksum = sequência ^ comando ^ dado
+// Cada quadro recebido é respondido com um quadro de mesma sequência
+const byte INICIO_PEDIDO = 0xA5;
+const byte INICIO_RESPOSTA = 0x5A;
+const byte TAMANHO_QUADRO = 5;
+const byte CMD_OLA = 0x01;    // Resposta: versão do protocolo
+const byte CMD_TROCA = 0x02;  // Dado: byte das saídas (bit 0 = O1); resposta: byte das entradas (bit 0 = I1)
+const byte CMD_ERRO = 0x7F;   // Resposta a quadro com checksum inválido ou comando desconhecido
+const byte VERSAO_PROTOCOLO = 1;
+
+int pinosLeds[8] = {led1, led2, led3, led4, led5, led6, led7, led8};
+int pinosBotoes[8] = {btn1, btn2, btn3, btn4, btn5, btn6, btn7, btn8};
+
 
 
 // ========== INSTANCIAÇÃO........... ==========
@@ -62,6 +76,53 @@ void setup() {
   pinMode(btn8, INPUT);
 
   Serial.begin(9600); //Inicia o Monitor Serial
+  Serial.setTimeout(100); //Tempo máximo para receber o restante de um quadro ou instrução
+}
+
+
+
+// ========== PROTOCOLO BINÁRIO
+byte lerBotoes() {
+  byte estado = 0;
+  for (int i = 0; i < 8; i++) {
+    if (digitalRead(pinosBotoes[i]) == HIGH) {
+      estado |= (1 << i);
+    }
+  }
+  return estado;
+}
+
+void escreverLeds(byte estado) {
+  for (int i = 0; i < 8; i++) {
+    digitalWrite(pinosLeds[i], (estado >> i) & 1 ? HIGH : LOW);
+  }
+}
+
+void responderQuadro(byte sequencia, byte comando, byte dado) {
+  byte resposta[TAMANHO_QUADRO] = {INICIO_RESPOSTA, sequencia, comando, dado, (byte)(sequencia ^ comando ^ dado)};
+  Serial.write(resposta, TAMANHO_QUADRO);
+}
+
+void tratarQuadro() {
+  byte quadro[TAMANHO_QUADRO];
+  if (Serial.readBytes(quadro, TAMANHO_QUADRO) < TAMANHO_QUADRO) {
+    return; // Quadro incompleto: descartado, o computador detecta pelo tempo limite
+  }
+  byte sequencia = quadro[1];
+  byte comando = quadro[2];
+  byte dado = quadro[3];
+
+  if ((byte)(sequencia ^ comando ^ dado) != quadro[4]) {
+    responderQuadro(sequencia, CMD_ERRO, 0);
+  } else if (comando == CMD_OLA) {
+    responderQuadro(sequencia, CMD_OLA, VERSAO_PROTOCOLO);
+  } else if (comando == CMD_TROCA) {
+    // Uma única troca por varredura: aplica as saídas e devolve as entradas
+    escreverLeds(dado);
+    responderQuadro(sequencia, CMD_TROCA, lerBotoes());
+  } else {
+    responderQuadro(sequencia, CMD_ERRO, 0);
+  }
 }
 
 
@@ -71,6 +132,12 @@ void loop() {
   // ========== VALIDAÇÃO DA INSTRUÇÃO RECEBIDA
   if (Serial.available() > 0) {
 
+    // Quadros binários começam com INICIO_PEDIDO; as instruções em texto começam com '@'
+    if (Serial.peek() == INICIO_PEDIDO) {
+      tratarQuadro();
+      return;
+    }
+
     //PEGAR A INSTRUCAO
     instrucaoinicial = Serial.readStringUntil('#');
 
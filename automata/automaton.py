@@ -1,3 +1,8 @@
+import logging
+
+logger = logging.getLogger('clp.automaton')
+
+
 class Transition:
     char = ''
     read = ''               #from stack
@@ -29,133 +34,161 @@ class State:
         retString = f"{retString}],\n\tisFinal:{self.isFinal}]"
         return retString
 
+# States of the pushdown automaton, built once at import and shared (read-only) by every Automaton
+STATES = (
+    #State 0
+    State(
+        [Transition('?', '?', '$', 1)],
+        False
+    ),
+    #State 1
+    State(
+        [Transition('o','?','?',2),
+         Transition('b','?','?',2),
+         Transition('ton','?','?',2),
+         Transition('tof','?','?',2),
+         Transition('cup','?','?',2),
+         Transition('cdn','?','?',2)],
+        False
+    ),
+    #State 2
+    State(
+        [Transition('=','?','?',3)],
+        False
+    ),
+    #State 3
+    State(
+        [Transition('!','?','?',5),
+         Transition('(','?','X',8),
+         Transition('i','?','?',4),
+         Transition('o','?','?',4),
+         Transition('b','?','?',4),
+         Transition('tono','?','?',4),
+         Transition('tofo','?','?',4),
+         Transition('cupo','?','?',4),
+         Transition('cdno','?','?',4)],
+        False
+    ),
+    #State 4
+    State(
+        [Transition(')','X','?',4),
+         Transition('?','$','?',10),
+         Transition('|','?','?',6),
+         Transition('^','?','?',6)],
+        False
+    ),
+    #State 5
+    State(
+        [Transition('(','?','X',8),
+         Transition('i','?','?',7),
+         Transition('o','?','?',7),
+         Transition('b','?','?',7),
+         Transition('tono','?','?',7),
+         Transition('tofo','?','?',7),
+         Transition('cupo','?','?',7),
+         Transition('cdno','?','?',7)],
+        False
+    ),
+    #State 6
+    State(
+        [Transition('(','?','X',8),
+         Transition('i','?','?',9),
+         Transition('o','?','?',9),
+         Transition('b','?','?',9),
+         Transition('tono','?','?',9),
+         Transition('tofo','?','?',9),
+         Transition('cupo','?','?',9),
+         Transition('cdno','?','?',9),
+         Transition('!','?','?',5)],
+        False
+    ),
+    #State 7
+    State(
+        [Transition('^','?','?',6),
+         Transition('|','?','?',6),
+         Transition('?','$','?',10),
+         Transition(')','X','?',4)],
+        False
+    ),
+    #State 8
+    State(
+        [Transition('(','?','X',8),
+         Transition('i','?','?',11),
+         Transition('o','?','?',11),
+         Transition('b','?','?',11),
+         Transition('tono','?','?',11),
+         Transition('tofo','?','?',11),
+         Transition('cupo','?','?',11),
+         Transition('cdno','?','?',11),
+         Transition('!','?','?',5)],
+        False
+    ),
+    #State 9
+    State(
+        [Transition(')','X','?',4),
+         Transition('?','$','?',10)],
+        False
+    ),
+    #State 10
+    State(
+        [],
+        True
+    ),
+    #State 11
+    State(
+        [Transition('^','?','?',12),
+         Transition('|','?','?',12),
+         Transition(')','X','?',4)],
+        False
+    ),
+    #State 12
+    State(
+        [Transition('i','?','?',13),
+         Transition('o','?','?',13),
+         Transition('b','?','?',13),
+         Transition('tono','?','?',13),
+         Transition('tofo','?','?',13),
+         Transition('cupo','?','?',13),
+         Transition('cdno','?','?',13),
+         Transition('(','?','X',8)],
+        False
+    ),
+    #State 13
+    State(
+        [Transition(')','X','?',4)],
+        False
+    ),
+)
+
+# Transition table built once at import:
+#   TRANSITION_TABLE[(stateIndex, char)] -> Transition that reads 'char'
+#   EMPTY_TRANSITIONS[stateIndex] -> empty transition ('?'), used when no transition reads the token
+TRANSITION_TABLE = {}
+EMPTY_TRANSITIONS = {}
+for _stateIndex, _state in enumerate(STATES):
+    for _transition in _state.transitions:
+        if _transition.char == '?':
+            EMPTY_TRANSITIONS[_stateIndex] = _transition
+        else:
+            TRANSITION_TABLE[(_stateIndex, _transition.char)] = _transition
+
 class Automaton:
-    states = []
-    stack = []
+    states = STATES
 
     def __init__(self) -> None:
-        #State 0
-        self.states.append(State(
-            [Transition('?', '?', '$', 1)],
-            False
-        ))
-        #State 1
-        self.states.append(State(
-            [Transition('o','?','?',2),
-             Transition('b','?','?',2),
-             Transition('ton','?','?',2),
-             Transition('tof','?','?',2),
-             Transition('cup','?','?',2),
-             Transition('cdn','?','?',2)],
-            False
-        ))
-        #State 2
-        self.states.append(State(
-            [Transition('=','?','?',3)],
-            False
-        ))
-        #State 3
-        self.states.append(State(
-            [Transition('!','?','?',5),
-             Transition('(','?','X',8),
-             Transition('i','?','?',4),
-             Transition('o','?','?',4),
-             Transition('b','?','?',4),
-             Transition('tono','?','?',4),
-             Transition('tofo','?','?',4),
-             Transition('cupo','?','?',4),
-             Transition('cdno','?','?',4)],
-            False
-        ))
-        #State 4
-        self.states.append(State(
-            [Transition(')','X','?',4),
-             Transition('?','$','?',10),
-             Transition('|','?','?',6),
-             Transition('^','?','?',6)],
-            False
-        ))
-        #State 5
-        self.states.append(State(
-            [Transition('(','?','X',8),
-             Transition('i','?','?',7),
-             Transition('o','?','?',7),
-             Transition('b','?','?',7),
-             Transition('tono','?','?',7),
-             Transition('tofo','?','?',7),
-             Transition('cupo','?','?',7),
-             Transition('cdno','?','?',7)],
-            False
-        ))
-        #State 6
-        self.states.append(State(
-            [Transition('(','?','X',8),
-             Transition('i','?','?',9),
-             Transition('o','?','?',9),
-             Transition('b','?','?',9),
-             Transition('tono','?','?',9),
-             Transition('tofo','?','?',9),
-             Transition('cupo','?','?',9),
-             Transition('cdno','?','?',9),
-             Transition('!','?','?',5)],
-            False
-        ))
-        #State 7
-        self.states.append(State(
-            [Transition('^','?','?',6),
-             Transition('|','?','?',6),
-             Transition('?','$','?',10),
-             Transition(')','X','?',4)],
-            False
-        ))
-        #State 8
-        self.states.append(State(
-            [Transition('(','?','X',8),
-             Transition('i','?','?',11),
-             Transition('o','?','?',11),
-             Transition('b','?','?',11),
-             Transition('tono','?','?',11),
-             Transition('tofo','?','?',11),
-             Transition('cupo','?','?',11),
-             Transition('cdno','?','?',11),
-             Transition('!','?','?',5)],
-            False
-        ))
-        #State 9
-        self.states.append(State(
-            [Transition(')','X','?',4),
-             Transition('?','$','?',10)],
-            False
-        ))
-        #State 10
-        self.states.append(State(
-            [],
-            True
-        ))
-        #State 11
-        self.states.append(State(
-            [Transition('^','?','?',12),
-             Transition('|','?','?',12),
-             Transition(')','X','?',4)],
-            False
-        ))
-        #State 12
-        self.states.append(State(
-            [Transition('i','?','?',13),
-             Transition('o','?','?',13),
-             Transition('b','?','?',13),
-             Transition('tono','?','?',13),
-             Transition('tofo','?','?',13),
-             Transition('cupo','?','?',13),
-             Transition('cdno','?','?',13),
-             Transition('(','?','X',8)],
-            False
-        ))
-        #State 13
-        self.states.append(State(
-            [Transition(')','X','?',4)],
-            False
-        ))
+        # Each validation gets its own stack
+        self.stack = []
+
+    #Returns the transition that reads the token from the given state, falling back
+    #to the empty transition. Returns (transition, isEmpty), or (None, False) if there is none
+    def transition(self, stateIndex, token):
+        transition = TRANSITION_TABLE.get((stateIndex, token))
+        if transition is not None:
+            return transition, False
+        transition = EMPTY_TRANSITIONS.get(stateIndex)
+        if transition is not None:
+            return transition, True
+        return None, False
 
     def __str__(self):
         retString = "Automaton:[states:["
@@ -166,23 +199,25 @@ class Automaton:
         retString = retString + "]"
         return retString
 
-    #Prints the stack
+    #Logs the stack (debug level)
     def showStack(self):
-        print(f"Automaton Stack: {self.stack}")
+        logger.debug("Automaton Stack: %s", self.stack)
 
     #Pushes a value into the stack
     def pushToStack(self, char):
         self.stack.append(char)
-        print(f"Added {char} into the stack {self.stack}")
+        logger.debug("Added %s into the stack %s", char, self.stack)
 
     #Reads the lastVale in the stack. if it's equal to the
     #returns true if lastValue == char, returns false otherwise
     def readFromStack(self, char):
+        if not self.stack:
+            return False
         lastIndex = len(self.stack) - 1
         lastValue = self.stack[lastIndex]
         if(lastValue == char):
             self.stack.pop()
-            print(f"Read {char} from stack {self.stack}")
+            logger.debug("Read %s from stack %s", char, self.stack)
             return True
         else:
             return False
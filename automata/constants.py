@@ -1,12 +1,16 @@
-OUTPUT_LABELS = ['O1','O2','O3','O4','O5','O6','O7','O8']
-INPUT_LABELS = ['I1','I2','I3','I4','I5','I6','I7','I8']
-BOOLEAN_LABELS = ['B1','B2','B3','B4','B5','B6','B7','B8']
-TIMER_ON_LABELS = ['TON1','TON2','TON3','TON4','TON5','TON6','TON7','TON8']
-TIMER_ON_OUTS_LABELS = ['TONO1', 'TONO2', 'TONO3', 'TONO4', 'TONO5', 'TONO6', 'TONO7', 'TONO8']
-TIMER_OF_LABELS = ['TOF1','TOF2','TOF3','TOF4','TOF5','TOF6','TOF7','TOF8']
-TIMER_OF_OUTS_LABELS = ['TOFO1', 'TOFO2', 'TOFO3', 'TOFO4', 'TOFO5', 'TOFO6', 'TOFO7', 'TOFO8']
-COUNTER_UP_LABELS = ['CUP1', 'CUP2', 'CUP3', 'CUP4', 'CUP5', 'CUP6', 'CUP7', 'CUP8']
-COUNTER_UP_OUTS_LABELS = ['CUPO1', 'CUPO2', 'CUPO3', 'CUPO4', 'CUPO5', 'CUPO6', 'CUPO7', 'CUPO8']
-COUNTER_DOWN_LABELS = ['CDN1', 'CDN2', 'CDN3', 'CDN4', 'CDN5', 'CDN6', 'CDN7', 'CDN8']
-COUNTER_DOWN_OUTS_LABELS = ['CDNO1', 'CDNO2', 'CDNO3', 'CDNO4', 'CDNO5', 'CDNO6', 'CDNO7', 'CDNO8']
 ALPHABET = ['i','b','cup', 'cupo', 'cdn', 'cdno','o','ton', 'tono', 'tof','tofo','=','!','^','|','(',')']
+
+# Highest valid address for each label class (I1..I8, B1..B32, T1..T32, C1..C8)
+ADDRESS_LIMITS = {
+    'i': 8,
+    'o': 8,
+    'b': 32,
+    'ton': 32,
+    'tono': 32,
+    'tof': 32,
+    'tofo': 32,
+    'cup': 8,
+    'cupo': 8,
+    'cdn': 8,
+    'cdno': 8,
+}
@@ -0,0 +1,40 @@
+import re
+from collections import namedtuple
+
+from .constants import ADDRESS_LIMITS
+
+# kind: token class from the ALPHABET ('i', 'tono', '^', ...)
+# index: address of a label (TONO2 -> 2), None for symbols
+# text: canonical text of the token ('TONO2', '^', ...)
+Token = namedtuple('Token', ['kind', 'index', 'text'])
+
+# Longer prefixes come first so TONO2 is not read as TON + O2. Any other
+# character falls into the last group and is reported as an error.
+LEXER_PATTERN = re.compile(r'(TONO|TOFO|CUPO|CDNO|TON|TOF|CUP|CDN|I|O|B)(\d+)|([=!^|()])|(.)')
+
+
+class LexerError(ValueError):
+    pass
+
+
+def lex(sentence, limits=ADDRESS_LIMITS):
+    """
+    Classifies every label and symbol of the sentence in a single scan.
+    Raises LexerError for unknown labels or addresses outside 'limits'
+    (pass limits=None to accept any address, e.g. for PLCs with more timers).
+    """
+    tokens = []
+    # Blanks are ignored anywhere, even inside a label ('TON 1' is TON1)
+    for match in LEXER_PATTERN.finditer(''.join(sentence.upper().split())):
+        label, digits, symbol, invalid = match.groups()
+        if invalid is not None:
+            raise LexerError(f"Invalid character '{invalid}'")
+        if symbol is not None:
+            tokens.append(Token(symbol, None, symbol))
+            continue
+        kind = label.lower()
+        index = int(digits)
+        if index < 1 or (limits is not None and index > limits[kind]):
+            raise LexerError(f"Address out of range: {label}{digits}")
+        tokens.append(Token(kind, index, f"{label}{index}"))
+    return tokens
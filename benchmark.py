@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from headless import build_scan_cycle, load_program_file
+from scan_cycle.codegen import packed_rung_source, rung_source
+from scan_cycle.instructions import analyze_rung, resolve_rung
+from scan_cycle.optimizer import optimize_program
+from scan_cycle.program_generator import GeneratorConfig, generate_program
+from scan_cycle.scan_cycle import BACKENDS
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'example_programs')
+
+# Formas de execução medidas: os backends do ScanCycle, o PackedScanCycle e o modo orientado a mudanças
+BENCHMARK_BACKENDS = BACKENDS + ('packed', 'change-driven')
+
+# Versão do formato do arquivo de resultados
+RESULTS_VERSION = 1
+
+# Varreduras executadas na medição de memória
+MEMORY_SCANS = 50
+
+
+def default_workloads():
+    """
+    Retorna as cargas padrão: [(nome, linhas do programa, presets de temporizadores)].
+    """
+    workloads = []
+    for name in sorted(os.listdir(EXAMPLES_DIR)):
+        if name.endswith('.txt'):
+            workloads.append((name[:-4], load_program_file(os.path.join(EXAMPLES_DIR, name)), {'T1': 5}))
+    timer_presets = {f'T{i}': i % 7 + 1 for i in range(1, 33)}
+    no_timers = {'timer_density': 0, 'counter_density': 0}
+    workloads.append(('wide', generate_program(GeneratorConfig(rungs=400, depth=1, fan_in=3, seed=1, **no_timers)), {}))
+    workloads.append(('deep', generate_program(GeneratorConfig(rungs=40, depth=6, seed=2, **no_timers)), {}))
+    workloads.append(('timers', generate_program(GeneratorConfig(
+        rungs=120, depth=2, timer_density=0.25, counter_density=0.06, seed=3,
+    )), timer_presets))
+    return workloads
+
+
+def input_sequence(scans, seed, toggle_probability=0.1):
+    """
+    Sequência reprodutível de estados das entradas: a cada varredura cada entrada
+    muda com a probabilidade indicada.
+    """
+    rng = random.Random(seed)
+    state = [False] * 8
+    sequence = []
+    for _ in range(scans):
+        state = [not value if rng.random() < toggle_probability else value for value in state]
+        sequence.append(state)
+    return sequence
+
+
+def _clear_compile_caches():
+    # Os caches de compilação são globais: sem limpá-los o tempo de compilação mediria apenas consultas
+    for cached in (resolve_rung, analyze_rung, rung_source, packed_rung_source, optimize_program):
+        cached.cache_clear()
+
+
+def _build(program_lines, backend, timer_presets):
+    if backend == 'change-driven':
+        return build_scan_cycle(program_lines, 'resolved', timer_presets, change_driven=True)
+    return build_scan_cycle(program_lines, backend, timer_presets)
+
+
+def _run_scans(scan_cycle, sequence):
+    set_input = scan_cycle.set_input
+    scan = scan_cycle.scan
+    for state in sequence:
+        for index, value in enumerate(state):
+            set_input(index, value)
+        scan()
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def measure(program_lines, backend, timer_presets, scans, seed=0):
+    """
+    Mede uma carga em um backend: tempo de compilação, varreduras por segundo,
+    percentis de latência por varredura e pico de memória alocada.
+    """
+    sequence = input_sequence(scans, seed)
+
+    _clear_compile_caches()
+    start = time.perf_counter()
+    scan_cycle = _build(program_lines, backend, timer_presets)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _run_scans(scan_cycle, sequence)
+    elapsed = time.perf_counter() - start
+
+    # Latência: mede cada varredura separadamente em uma nova execução com as mesmas entradas
+    scan_cycle = _build(program_lines, backend, timer_presets)
+    set_input = scan_cycle.set_input
+    latencies = []
+    for state in sequence:
+        for index, value in enumerate(state):
+            set_input(index, value)
+        scan_start = time.perf_counter_ns()
+        scan_cycle.scan()
+        latencies.append((time.perf_counter_ns() - scan_start) / 1000)
+    latencies.sort()
+
+    # Memória: pico de alocações ao compilar e executar as primeiras varreduras
+    # (medido à parte e com menos varreduras, pois tracemalloc é lento)
+    _clear_compile_caches()
+    tracemalloc.start()
+    _run_scans(_build(program_lines, backend, timer_presets), sequence[:MEMORY_SCANS])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'compile_time_ms': compile_time * 1000,
+        'scans': scans,
+        'scans_per_second': scans / elapsed if elapsed > 0 else float('inf'),
+        'latency_us': {
+            'p50': _percentile(latencies, 0.50),
+            'p90': _percentile(latencies, 0.90),
+            'p99': _percentile(latencies, 0.99),
+            'max': latencies[-1],
+        },
+        'peak_memory_kib': peak / 1024,
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_benchmarks(workloads, backends, scans, seed=0):
+    """
+    Executa todas as combinações de carga e backend e retorna o dicionário de resultados.
+    """
+    results = {
+        'version': RESULTS_VERSION,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': seed,
+        'workloads': {},
+    }
+    for name, program_lines, timer_presets in workloads:
+        results['workloads'][name] = {
+            'rungs': len(program_lines),
+            'backends': {
+                backend: measure(program_lines, backend, timer_presets, scans, seed) for backend in backends
+            },
+        }
+    return results
+
+
+def format_results(results, baseline=None):
+    """
+    Formata os resultados em tabela. Com baseline, inclui a razão de varreduras/s em relação a ela.
+    """
+    header = f"{'carga':<10} {'backend':<14} {'compilação ms':>14} {'varreduras/s':>14} {'p50 us':>9} {'p99 us':>9} {'memória KiB':>12}"
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    lines = [header]
+    for name, workload in results['workloads'].items():
+        for backend, result in workload['backends'].items():
+            line = (f"{name:<10} {backend:<14} {result['compile_time_ms']:>14.2f} {result['scans_per_second']:>14.1f} "
+                    f"{result['latency_us']['p50']:>9.1f} {result['latency_us']['p99']:>9.1f} "
+                    f"{result['peak_memory_kib']:>12.1f}")
+            if baseline is not None:
+                previous = baseline.get('workloads', {}).get(name, {}).get('backends', {}).get(backend)
+                if previous:
+                    line += f" {result['scans_per_second'] / previous['scans_per_second']:>7.2f}x"
+                else:
+                    line += f" {'-':>8}"
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o desempenho do ciclo de varredura em cargas reprodutíveis.")
+    parser.add_argument('-n', '--scans', type=int, default=500, help="Varreduras por medição")
+    parser.add_argument('-b', '--backend', action='append', choices=BENCHMARK_BACKENDS,
+                        help="Backend a medir (pode repetir). Padrão: todos")
+    parser.add_argument('-w', '--workload', action='append',
+                        help="Carga a medir (nome de example_programs/ sem .txt, wide, deep ou timers). Padrão: todas")
+    parser.add_argument('--seed', type=int, default=0, help="Semente das sequências de entradas")
+    parser.add_argument('-o', '--output', help="Arquivo JSON onde os resultados são gravados")
+    parser.add_argument('--compare', help="Arquivo JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    workloads = default_workloads()
+    if args.workload:
+        unknown = set(args.workload) - {name for name, _, _ in workloads}
+        if unknown:
+            parser.error(f"Cargas desconhecidas: {', '.join(sorted(unknown))}")
+        workloads = [workload for workload in workloads if workload[0] in args.workload]
+
+    results = run_benchmarks(workloads, args.backend or BENCHMARK_BACKENDS, args.scans, args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print(format_results(results, baseline))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
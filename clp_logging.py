@@ -0,0 +1,59 @@
+import logging
+import os
+import sys
+
+# Todos os módulos registram mensagens em loggers filhos de 'clp' (logging.getLogger('clp.<subsistema>'))
+ROOT_LOGGER = 'clp'
+SUBSYSTEMS = ('automaton', 'compiler', 'counter', 'logical_structure', 'scan_cycle', 'serial', 'timer')
+
+# Variável de ambiente lida por configure_logging quando nenhuma configuração é passada
+ENVIRONMENT_VARIABLE = 'CLP_LOG'
+
+LOG_FORMAT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
+
+# Sem configuração, as mensagens não aparecem (nem avisos): execuções normais ficam silenciosas
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+
+def parse_log_spec(spec):
+    """
+    Converte uma configuração como 'INFO' ou 'WARNING,timer=DEBUG,serial=INFO' em
+    (nível geral, {subsistema: nível}). O nível geral é None quando não informado.
+    """
+    default = None
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, sep, level = item.rpartition('=')
+        level = level.strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Nível de log inválido: {level}")
+        if not sep:
+            default = level
+        elif name.strip() in SUBSYSTEMS:
+            levels[name.strip()] = level
+        else:
+            raise ValueError(f"Subsistema de log desconhecido: {name}. Subsistemas: {', '.join(SUBSYSTEMS)}.")
+    return default, levels
+
+
+def configure_logging(spec=None, stream=None):
+    """
+    Liga a saída de log em stderr com os níveis da configuração (ver parse_log_spec).
+    Sem spec, usa a variável de ambiente CLP_LOG; se ela também não existir, nada muda.
+    As chamadas de log desabilitadas não formatam a mensagem (os argumentos são passados
+    no estilo '%s' e só são formatados quando o nível está ligado).
+    """
+    if spec is None:
+        spec = os.environ.get(ENVIRONMENT_VARIABLE, '')
+    if not spec:
+        return
+    default, levels = parse_log_spec(spec)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    if not any(isinstance(handler, logging.StreamHandler) for handler in root.handlers):
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(default or logging.WARNING)
+    for subsystem in SUBSYSTEMS:
+        logging.getLogger(f'{ROOT_LOGGER}.{subsystem}').setLevel(levels.get(subsystem, logging.NOTSET))
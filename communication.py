@@ -1,11 +1,42 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from functools import partial
+
 import serial
 import serial.tools.list_ports
 
+logger = logging.getLogger('clp.serial')
+
 #Port initialization
 portList = [comport.device for comport in serial.tools.list_ports.comports()]
-print(portList)
+logger.info('Serial ports found: %s', portList)
 portIndex = 0
 
+#ASCII protocol messages (see arduino_code/principal.ino), used by the blocking helpers below
+INI_COMMAND = b'@ini#'
+READ_COMMAND = b'@read#'
+ACK_RESPONSE = b'@ack#'
+RECEIVED_RESPONSE = b'@rcv#'
+BUTTONS_RESPONSE_SIZE = 10  #'@' + 8 button states + '#'
+
+#Binary protocol used by SerialTransport: 5-byte frames [start][sequence][command][data][checksum],
+#with checksum = sequence ^ command ^ data. Each request frame is answered by one response frame
+#with the same sequence number, so a late or lost response is detected instead of being misread.
+FRAME_REQUEST_START = 0xA5
+FRAME_RESPONSE_START = 0x5A
+FRAME_SIZE = 5
+FRAME_HELLO = 0x01  #Response data: PROTOCOL_VERSION
+FRAME_EXCHANGE = 0x02  #Request data: output byte (bit 0 = O1); response data: input byte (bit 0 = I1)
+FRAME_ERROR = 0x7F  #Response to a frame with a bad checksum or an unknown command
+PROTOCOL_VERSION = 1
+
+#Latest input reading received from the Arduino: time.monotonic() of the reading and the states of I1..I8
+InputReading = namedtuple('InputReading', ['timestamp', 'inputs'])
+
 #Serial Configuration
 #Remeber to check which port linux assigned the Arduino. It is usually /dev/ttyACM0 or /dev/ttyACM1
 
@@ -16,31 +47,256 @@ def initializeSerial():
             port = serial.Serial(port=portList[portIndex], baudrate=9600, timeout=5)
             return port
         except:
-            print(f'Couldn\'t initalize serial on port: {portList[i]}')
+            logger.warning('Couldn\'t initalize serial on port: %s', portList[i])
             i += 1
     return 'none'        
 
 def estabilishConnection(port):
-    print(f'SERIAL> Attempting connection on port: {port.port}')
-    port.write('@ini#'.encode('utf-8'))
-    response = port.read_until(size=5)
-    if(response == b'@ack#'):
-        print(f'SERIAL> {response}')
+    logger.info('SERIAL> Attempting connection on port: %s', port.port)
+    port.write(INI_COMMAND)
+    response = port.read_until(size=len(ACK_RESPONSE))
+    if(response == ACK_RESPONSE):
+        logger.info('SERIAL> %s', response)
         return True
     return False
 
 def readButtons(port):
-    print('SERIAL> Attempt readButtons...')
-    port.write('@read#'.encode('utf-8'))
-    response = port.read_until(size=10)
-    print(f'SERIAL> {response}')
+    logger.debug('SERIAL> Attempt readButtons...')
+    port.write(READ_COMMAND)
+    response = port.read_until(size=BUTTONS_RESPONSE_SIZE)
+    logger.debug('SERIAL> %s', response)
     return response
 
+#ledByte is the output byte exported by ScanCycle.led_byte() (bit 0 = O1 ... bit 7 = O8)
 def sendLedByte(port, ledByte):
-    print('SERIAL> Attempt write ledByte...')
-    port.write(ledByte)
-    response = port.read_until(size=5)
-    if(response == b'@rcv#'):
-        print(f'SERIAL> {response}')
+    logger.debug('SERIAL> Attempt write ledByte...')
+    port.write(encodeLedByte(ledByte))
+    response = port.read_until(size=len(RECEIVED_RESPONSE))
+    if(response == RECEIVED_RESPONSE):
+        logger.debug('SERIAL> %s', response)
         return True
     return False
+
+def encodeLedByte(ledByte):
+    leds = ''.join('1' if ledByte >> i & 1 else '0' for i in range(8))
+    return f'@{leds}#'.encode('utf-8')
+
+#Converts a readButtons response (b'@10000000#') into the states of I1..I8
+def decodeButtons(response):
+    if len(response) != BUTTONS_RESPONSE_SIZE or response[:1] != b'@' or response[-1:] != b'#' \
+            or not set(response[1:-1]) <= set(b'01'):
+        raise ValueError(f'Invalid buttons response: {response!r}')
+    return tuple(state == ord('1') for state in response[1:-1])
+
+
+class StaleFrameError(ValueError):
+    """
+    A valid frame answering an earlier request, e.g. one that arrived after its request timed out.
+    """
+
+
+def encodeFrame(sequence, command, data, start=FRAME_REQUEST_START):
+    return bytes((start, sequence, command, data, sequence ^ command ^ data))
+
+#Validates the response frame to the request (sequence, command) and returns its data byte
+def decodeFrame(frame, sequence, command):
+    if len(frame) != FRAME_SIZE or frame[0] != FRAME_RESPONSE_START:
+        raise ValueError(f'Invalid frame: {frame!r}')
+    if frame[1] ^ frame[2] ^ frame[3] != frame[4]:
+        raise ValueError(f'Frame checksum mismatch: {frame!r}')
+    if frame[1] != sequence:
+        raise StaleFrameError(f'Unexpected frame sequence {frame[1]} (expected {sequence})')
+    if frame[2] == FRAME_ERROR:
+        raise ValueError(f'Frame {sequence} rejected by the Arduino')
+    if frame[2] != command:
+        raise ValueError(f'Unexpected frame command {frame[2]} (expected {command})')
+    return frame[3]
+
+
+class _Request:
+    __slots__ = ('payload', 'responseSize', 'deadline', 'parse', 'future', 'sent')
+
+    def __init__(self, payload, responseSize, deadline, parse):
+        self.payload = payload
+        self.responseSize = responseSize
+        self.deadline = deadline
+        self.parse = parse
+        self.future = Future()
+        self.sent = False
+
+
+class SerialTransport:
+    """
+    Asynchronous serial transport: all port traffic runs on a dedicated I/O thread, so neither
+    the GUI nor the scan cycle ever blocks on the Arduino.
+    Requests are pipelined: every request waiting when the I/O thread wakes up is sent in a single
+    write and the responses are read back in order, each one bounded by its own timeout.
+    handshake and exchange use the binary frame protocol (FRAME_*): one 5-byte frame each way per scan.
+    Input readings are kept in a ring buffer; 'latest' returns the newest one without waiting.
+    When reconnecting on the same port, pass the stopped transport as 'previous': the new I/O thread
+    waits for the old one to leave the port before touching it, so it cannot steal a response.
+    """
+
+    def __init__(self, port, timeout=0.5, history=32, previous=None):
+        self.port = port
+        self.previous = previous
+        self.timeout = timeout  #Default timeout of a request, in seconds
+        self.readings = deque(maxlen=history)  #Ring buffer of InputReading, oldest first
+        self.timeouts = 0
+        self._requests = queue.SimpleQueue()
+        self._exchangeLock = threading.Lock()
+        self._pendingExchange = None
+        #Continuing the previous numbering keeps its late frames from matching our requests
+        self._sequence = previous._sequence if previous is not None else 0
+        self._received = bytearray()  #Bytes read from the port that do not form a complete response yet
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='serial-io', daemon=True)
+
+    @property
+    def latest(self):
+        try:
+            return self.readings[-1]
+        except IndexError:
+            return None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        self._requests.put(None)  #Wakes the I/O thread up
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def request(self, payload, responseSize, timeout=None, parse=None):
+        """
+        Queues a raw request and returns a Future with the response (parse(response) when parse is given).
+        The Future fails with TimeoutError if the full response does not arrive within the timeout.
+        """
+        request = _Request(payload, responseSize, time.monotonic() + (timeout or self.timeout), parse)
+        self._queue(request)
+        return request.future
+
+    def _queue(self, request):
+        if self._stopped.is_set():
+            request.future.set_exception(ConnectionError('Serial transport stopped'))
+        else:
+            self._requests.put(request)
+
+    def _nextSequence(self):
+        with self._exchangeLock:
+            self._sequence = (self._sequence + 1) & 0xFF
+            return self._sequence
+
+    def handshake(self, timeout=None):
+        """
+        Checks that the Arduino answers with the expected protocol version (Future of bool).
+        """
+        sequence = self._nextSequence()
+        return self.request(
+            encodeFrame(sequence, FRAME_HELLO, 0), FRAME_SIZE, timeout,
+            lambda frame: decodeFrame(frame, sequence, FRAME_HELLO) == PROTOCOL_VERSION,
+        )
+
+    def exchange(self, ledByte, timeout=None):
+        """
+        Per-scan round trip: a single frame carries the outputs and its response carries the inputs.
+        The Future resolves to the input states, which are also stored in the ring buffer. If the
+        previous exchange has not been sent yet, it is updated with the new outputs instead of
+        queueing another one, so a slow port never accumulates a backlog of scans.
+        """
+        with self._exchangeLock:
+            pending = self._pendingExchange
+            if pending is not None and not pending.sent:
+                pending.payload = encodeFrame(pending.payload[1], FRAME_EXCHANGE, ledByte)
+                return pending.future
+            self._sequence = sequence = (self._sequence + 1) & 0xFF
+            request = _Request(encodeFrame(sequence, FRAME_EXCHANGE, ledByte), FRAME_SIZE,
+                               time.monotonic() + (timeout or self.timeout), partial(self._storeInputs, sequence))
+            self._pendingExchange = request
+        self._queue(request)
+        return request.future
+
+    def _storeInputs(self, sequence, frame):
+        inputByte = decodeFrame(frame, sequence, FRAME_EXCHANGE)
+        inputs = tuple(bool(inputByte >> i & 1) for i in range(8))
+        self.readings.append(InputReading(time.monotonic(), inputs))
+        return inputs
+
+    def _run(self):
+        if self.previous is not None:
+            self.previous._thread.join()  #Bounded by the timeout of the read it may be blocked in
+            self.previous = None
+            self.port.reset_input_buffer()
+        while not self._stopped.is_set():
+            batch = [self._requests.get()]
+            while True:
+                try:
+                    batch.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [request for request in batch if request is not None]
+            with self._exchangeLock:
+                for request in batch:
+                    request.sent = True
+            if self._stopped.is_set():
+                self._fail(batch, ConnectionError('Serial transport stopped'))
+            elif batch:
+                self._transfer(batch)
+
+    def _transfer(self, batch):
+        try:
+            self.port.write(b''.join(request.payload for request in batch))
+        except (OSError, serial.SerialException) as error:
+            logger.warning('SERIAL> Write failed: %s', error)
+            self._fail(batch, error)
+            return
+        for position, request in enumerate(batch):
+            try:
+                result = self._receive(request)
+            except TimeoutError as error:  #Before OSError, of which TimeoutError is a subclass
+                #Whatever part of the response already arrived stays buffered: when the rest comes in,
+                #the late frame is recognized by its sequence number and discarded
+                self.timeouts += 1
+                logger.debug('SERIAL> %s', error)
+                self._fail(batch[position:], error)
+                return
+            except (OSError, serial.SerialException) as error:
+                logger.warning('SERIAL> Read failed: %s', error)
+                self._fail(batch[position:], error)
+                return
+            except ValueError as error:
+                #Corrupted stream: drop everything received so far and fail the rest of the batch
+                logger.debug('SERIAL> %s', error)
+                self._received.clear()
+                self.port.reset_input_buffer()
+                self._fail(batch[position:], error)
+                return
+            request.future.set_result(result)
+
+    def _receive(self, request):
+        """
+        Reads the response to a request until its deadline. Stale frames (StaleFrameError raised
+        by request.parse) are discarded and reading continues with the next frame.
+        """
+        received = self._received
+        size = request.responseSize
+        while True:
+            while len(received) < size:
+                remaining = request.deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'No response within the timeout (got {bytes(received)!r})')
+                self.port.timeout = remaining
+                received += self.port.read(size - len(received))
+            response = bytes(received[:size])
+            del received[:size]
+            logger.debug('SERIAL> %s', response)
+            try:
+                return request.parse(response) if request.parse else response
+            except StaleFrameError as error:
+                logger.debug('SERIAL> Discarding stale frame: %s', error)
+
+    def _fail(self, batch, error):
+        for request in batch:
+            request.future.set_exception(error)
@@ -1,4 +1,9 @@
 
+import logging
+
+logger = logging.getLogger('clp.counter')
+
+
 class Counter:
     def __init__(self, name="C1", preset=0, counter_type='UP'):
         self.name = name
@@ -12,7 +17,7 @@ class Counter:
         """
         self.preset = preset
         self.count = 0  # Reset the count when starting
-        print(f"Started {self.type} counter {self.name} with preset {preset}.")
+        logger.debug("Started %s counter %s with preset %s.", self.type, self.name, preset)
 
     def increment(self):
         """
@@ -20,10 +25,10 @@ class Counter:
         """
         if self.type == 'UP':
             self.count += 1
-            print(f"Counter {self.name} incremented to {self.count}.")
+            logger.debug("Counter %s incremented to %s.", self.name, self.count)
             # Check if the counter has reached the preset value
             if self.count >= self.preset:
-                print(f"Counter {self.name} reached the preset value {self.preset}.")
+                logger.debug("Counter %s reached the preset value %s.", self.name, self.preset)
 
     def decrement(self):
         """
@@ -31,10 +36,10 @@ class Counter:
         """
         if self.type == 'DOWN':
             self.count -= 1
-            print(f"Counter {self.name} decremented to {self.count}.")
+            logger.debug("Counter %s decremented to %s.", self.name, self.count)
             # Check if the counter has reached or gone below the preset value
             if self.count <= self.preset:
-                print(f"Counter {self.name} reached the preset value {self.preset}.")
+                logger.debug("Counter %s reached the preset value %s.", self.name, self.preset)
 
     @property
     def triggered(self):
@@ -0,0 +1,70 @@
+import time
+
+TICK_SECONDS = 0.1  # Timer presets are expressed in ticks of 0.1 s
+
+
+class ScanTimeBase:
+    """
+    One timer tick per scan. Timer accuracy depends on the scan loop running every 100 ms.
+    """
+
+    def reset(self):
+        pass
+
+    def elapsed_ticks(self):
+        return 1
+
+
+class MonotonicTimeBase:
+    """
+    Advances timers by the elapsed monotonic time, independently of how often scans run.
+    Fractions of a tick are carried over to the next call, so no time is lost between scans.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._last = None
+
+    def reset(self):
+        """
+        Restarts the time reference (e.g. when the PLC enters RUN), discarding time spent stopped.
+        """
+        self._last = self._clock()
+
+    def elapsed_ticks(self):
+        now = self._clock()
+        if self._last is None:
+            self._last = now
+            return 0
+        ticks = int((now - self._last) / TICK_SECONDS)
+        self._last += ticks * TICK_SECONDS
+        return ticks
+
+
+class VirtualClock:
+    """
+    Simulated time base: time only moves when advance() is called, so scans can run
+    as fast as possible (or skip ahead) while timers keep the same semantics.
+    """
+
+    def __init__(self):
+        self.now = 0  # Current virtual time, in ticks
+        self._pending = 0
+
+    def reset(self):
+        self._pending = 0
+
+    def advance(self, ticks=1):
+        """
+        Moves the virtual time forward; the timers see it on the next elapsed_ticks() call.
+        """
+        self.now += ticks
+        self._pending += ticks
+
+    def advance_seconds(self, seconds):
+        self.advance(round(seconds / TICK_SECONDS))
+
+    def elapsed_ticks(self):
+        ticks = self._pending
+        self._pending = 0
+        return ticks
@@ -1,13 +1,35 @@
+import logging
+
+logger = logging.getLogger('clp.timer')
+
 # Class Timer
 
 class Timer:
-    def __init__(self, name="T1", preset=0, timer_type='ON DELAY'):
+    def __init__(self, name="T1", preset=0, timer_type='ON DELAY', scheduler=None):
         self.name = name
         self.preset = preset  # Preset value for delay time
         self.remaining_time = 0  # Time remaining for the current countdown
         self.isActive = False
         self.type = timer_type
         self.triggered = False
+        # Optional TimerScheduler. When set, expiries are driven by the scheduler
+        # instead of calling update() on every scan.
+        self.scheduler = scheduler
+        self.expiry_tick = 0
+        self.generation = 0  # Incremented on every start, invalidates older scheduled expiries
+
+    @property
+    def remaining_time(self):
+        """
+        Time remaining for the current countdown, in ticks of 0.1 s.
+        """
+        if self.scheduler is not None and self.isActive and self._remaining_time > 0:
+            return max(self.expiry_tick - self.scheduler.now, 0)
+        return self._remaining_time
+
+    @remaining_time.setter
+    def remaining_time(self, value):
+        self._remaining_time = value
 
     def start(self, delay):
         """
@@ -17,23 +39,35 @@ class Timer:
         self.remaining_time = delay  # Set the remaining time to preset value
         self.isActive = True
         self.triggered = False if self.type == 'ON DELAY' else True
-        print(f"Started {self.type} timer {self.name} with delay {delay * 0.1} seconds.")
+        self.generation += 1
+        if self.scheduler is not None and delay > 0:
+            self.scheduler.schedule(self, delay)
+        logger.debug("Started %s timer %s with delay %.1f seconds.", self.type, self.name, delay * 0.1)
 
     def update(self):
         """
         Updates the timer countdown.
+        Timers attached to a scheduler are advanced by it, so this does nothing for them.
         """
+        if self.scheduler is not None:
+            return
         if self.isActive and self.remaining_time > 0:
             self.remaining_time -= 1
-            print(f"Timer ({self.type}) countdown: {self.remaining_time * 0.1}s remaining.")
+            logger.debug("Timer (%s) countdown: %.1fs remaining.", self.type, self.remaining_time * 0.1)
 
             # Check if the timer has reached zero
             if self.remaining_time == 0:
-                self.isActive = False
-                if self.type == 'ON DELAY':
-                    self.triggered = True
-                    print(f"ON DELAY of Timer {self.name} completed. Activating output.")
-                elif self.type == 'OFF DELAY':
-                    self.triggered = False
-                    print(f"OFF DELAY of Timer {self.name} completed. Deactivating output.")
+                self.expire()
 
+    def expire(self):
+        """
+        Finishes the countdown and sets the output according to the timer type.
+        """
+        self.remaining_time = 0
+        self.isActive = False
+        if self.type == 'ON DELAY':
+            self.triggered = True
+            logger.debug("ON DELAY of Timer %s completed. Activating output.", self.name)
+        elif self.type == 'OFF DELAY':
+            self.triggered = False
+            logger.debug("OFF DELAY of Timer %s completed. Deactivating output.", self.name)
@@ -0,0 +1,80 @@
+import heapq
+
+# Smallest heap size that triggers a compaction (see TimerScheduler.schedule)
+MIN_COMPACT_SIZE = 64
+
+class TimerScheduler:
+    """
+    Keeps running timers in a min-heap keyed by their expiry tick, so advancing time
+    only touches timers that actually expire instead of iterating over every timer.
+    Timers stopped or restarted after being scheduled leave stale entries in the heap;
+    those are discarded lazily when they reach the top, and the heap is rebuilt from the
+    live entries whenever it doubles in size, so a coil that toggles often cannot grow it
+    beyond roughly twice the number of running timers.
+    """
+
+    def __init__(self):
+        self.now = 0  # Current tick (one tick = 0.1 s of timer time)
+        self._heap = []
+        self._sequence = 0  # Tie-breaker so timers are never compared
+        self._compact_at = MIN_COMPACT_SIZE
+
+    def schedule(self, timer, delay):
+        """
+        Schedules the timer to expire 'delay' ticks from now.
+        """
+        timer.expiry_tick = self.now + delay
+        self._sequence += 1
+        heapq.heappush(self._heap, (timer.expiry_tick, self._sequence, timer, timer.generation))
+        if len(self._heap) >= self._compact_at:
+            self._compact()
+
+    def _compact(self):
+        # Amortized O(1) per schedule: the next compaction only happens after the heap doubles again
+        self._heap = [
+            entry for entry in self._heap if entry[2].isActive and entry[2].generation == entry[3]
+        ]
+        heapq.heapify(self._heap)
+        self._compact_at = max(2 * len(self._heap), MIN_COMPACT_SIZE)
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap:
+            _, _, timer, generation = heap[0]
+            if timer.isActive and timer.generation == generation:
+                return
+            heapq.heappop(heap)
+
+    def next_expiry(self):
+        """
+        Returns the tick of the next pending expiry, or None if no timer is running.
+        """
+        self._discard_stale()
+        if self._heap:
+            return self._heap[0][0]
+        return None
+
+    def advance(self, ticks=1):
+        """
+        Advances the clock by 'ticks' and expires every timer due until then.
+        Returns the list of timers that expired.
+        """
+        self.now += ticks
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] <= self.now:
+            _, _, timer, generation = heapq.heappop(heap)
+            if timer.isActive and timer.generation == generation:
+                timer.expire()
+                expired.append(timer)
+        return expired
+
+    def clear(self):
+        """
+        Drops every scheduled expiry (the clock itself is not reset).
+        """
+        self._heap.clear()
+        self._compact_at = MIN_COMPACT_SIZE
+
+    def __len__(self):
+        return len(self._heap)
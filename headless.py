@@ -0,0 +1,224 @@
+import argparse
+import sys
+import time
+
+import clp_logging
+from components.timebase import MonotonicTimeBase, ScanTimeBase
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.compiler import LineCompileCache, compile_program
+from scan_cycle.packed import PackedScanCycle
+from scan_cycle.scan_cycle import BACKENDS, ScanCycle
+from scan_cycle.truth_table import format_truth_table, generate_truth_table
+
+
+def load_program_file(path):
+    """
+    Lê um programa no formato de example_programs/ e retorna suas linhas.
+    """
+    with open(path, 'r') as file:
+        return file.read().strip().splitlines()
+
+
+def validate_program(program_lines, compile_cache=None):
+    """
+    Valida as linhas do programa com o autômato, como a interface faz ao compilar.
+    Retorna a lista de mensagens de erro (vazia se o programa é válido).
+    """
+    compile_cache = compile_cache or LineCompileCache()
+    errors = []
+    for idx, validation in enumerate(compile_cache.validate_program(program_lines)):
+        if validation.status == 1:
+            errors.append(f'Erro de sintaxe na linha {idx + 1}')
+        elif validation.status == 2:
+            errors.append(f'Erro de rótulo na linha {idx + 1}')
+    return errors
+
+
+def parse_presets(assignments, option):
+    """
+    Converte argumentos no formato NOME=VALOR (ex: T1=30) em um dicionário.
+    """
+    presets = {}
+    for assignment in assignments:
+        name, sep, value = assignment.partition('=')
+        if not sep or not value.strip().lstrip('-').isdigit():
+            raise argparse.ArgumentTypeError(f"Valor inválido para {option}: {assignment}. Use NOME=VALOR.")
+        presets[name.strip().upper()] = int(value)
+    return presets
+
+
+def parse_inputs(pattern):
+    """
+    Converte uma sequência como '10100000' (I1..I8) em uma lista de booleanos.
+    """
+    if len(pattern) != 8 or any(c not in '01' for c in pattern):
+        raise argparse.ArgumentTypeError(f"Entradas inválidas: {pattern}. Use 8 dígitos 0/1 (I1..I8).")
+    return [c == '1' for c in pattern]
+
+
+TIMEBASES = {'scan': ScanTimeBase, 'monotonic': MonotonicTimeBase}
+
+
+def build_scan_cycle(program_lines, backend='rpn', timer_presets=None, counter_presets=None, timebase=None,
+                     change_driven=False):
+    """
+    Cria um ScanCycle em modo RUN com o programa carregado e os presets configurados.
+    """
+    if backend == 'packed':
+        if change_driven:
+            raise ValueError("A execução orientada a mudanças requer o backend 'resolved'.")
+        scan_cycle = PackedScanCycle(logical_structure=LogicalStructure([]), timebase=timebase)
+    else:
+        scan_cycle = ScanCycle(logical_structure=LogicalStructure([]), backend=backend, timebase=timebase,
+                               change_driven=change_driven)
+    scan_cycle.user_program = program_lines
+    for name, preset in (timer_presets or {}).items():
+        if name not in scan_cycle.timers:
+            raise ValueError(f"Temporizador desconhecido: {name}")
+        scan_cycle.timers[name].preset = preset
+    for name, preset in (counter_presets or {}).items():
+        if name not in scan_cycle.counters:
+            raise ValueError(f"Contador desconhecido: {name}")
+        scan_cycle.counters[name].preset = preset
+    scan_cycle.set_mode('RUN')
+    return scan_cycle
+
+
+def run(scan_cycle, cycles=None, seconds=None):
+    """
+    Executa scan() em laço até completar 'cycles' varreduras ou 'seconds' segundos.
+    Retorna (varreduras executadas, tempo decorrido em segundos).
+    """
+    scan = scan_cycle.scan
+    executed = 0
+    start = time.perf_counter()
+    if seconds is None:
+        for _ in range(cycles):
+            scan()
+        executed = cycles
+    else:
+        deadline = start + seconds
+        while time.perf_counter() < deadline and (cycles is None or executed < cycles):
+            scan()
+            executed += 1
+    return executed, time.perf_counter() - start
+
+
+def format_bits(values):
+    return ''.join('1' if value else '0' for value in values)
+
+
+def format_statistics(statistics, compiled_program, rungs=5):
+    """
+    Formata as estatísticas de varredura: tempos totais, fases e as linhas mais caras.
+    """
+    summary = statistics.summary()
+    lines = [
+        f"Tempo de varredura: mín {summary['min_us']:.1f} us, média {summary['avg_us']:.1f} us, "
+        f"p99 {summary['p99_us']:.1f} us, máx {summary['max_us']:.1f} us",
+    ]
+    if summary['budget_ms'] is not None:
+        lines.append(f"Estouros do tempo máximo ({summary['budget_ms']} ms): {summary['overruns']}")
+    for phase, times in summary['phases'].items():
+        lines.append(f"  {phase:<22} média {times['avg_us']:8.1f} us  máx {times['max_us']:8.1f} us")
+    for name, cost in statistics.rung_costs(compiled_program)[:rungs]:
+        lines.append(f"  linha {name:<16} {cost / 1000:8.2f} us/varredura")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa um programa do CLP sem interface gráfica.")
+    parser.add_argument('program', help="Arquivo do programa (formato de example_programs/)")
+    parser.add_argument('-n', '--cycles', type=int, help="Número de varreduras a executar")
+    parser.add_argument('-t', '--seconds', type=float, help="Tempo máximo de execução em segundos")
+    parser.add_argument('-i', '--inputs', type=parse_inputs, default=[False] * 8,
+                        help="Estado das entradas I1..I8, ex: 10100000")
+    parser.add_argument('--timer', action='append', default=[], metavar='TX=PRESET',
+                        help="Preset de temporizador em décimos de segundo, ex: T1=30")
+    parser.add_argument('--counter', action='append', default=[], metavar='CX=PRESET',
+                        help="Preset de contador, ex: C1=5")
+    parser.add_argument('-b', '--backend', choices=BACKENDS + ('packed',), default='rpn',
+                        help="Forma de execução do programa compilado")
+    parser.add_argument('--timebase', choices=sorted(TIMEBASES), default='scan',
+                        help="Base de tempo dos temporizadores: um tick por varredura (scan) ou tempo real (monotonic)")
+    parser.add_argument('--change-driven', action='store_true',
+                        help="Reavalia apenas as linhas cujas leituras mudaram (requer -b resolved)")
+    parser.add_argument('--stats', action='store_true',
+                        help="Mede o tempo de cada fase da varredura")
+    parser.add_argument('--profile-rungs', action='store_true',
+                        help="Como --stats, medindo também o custo de cada linha, executadas uma a uma "
+                             "(apenas -b rpn ou resolved sem --change-driven; deixa a varredura mais lenta)")
+    parser.add_argument('--budget-ms', type=float,
+                        help="Tempo máximo de varredura em ms; com --stats conta as varreduras que o excedem")
+    parser.add_argument('--log', metavar='NÍVEIS',
+                        help="Níveis de log, ex: INFO ou WARNING,timer=DEBUG (padrão: variável CLP_LOG)")
+    parser.add_argument('--truth-table', action='store_true',
+                        help="Imprime a tabela verdade do programa (apenas programas combinacionais)")
+    parser.add_argument('--with-outputs', action='store_true',
+                        help="Inclui o estado anterior de O1..O8 na tabela verdade")
+    args = parser.parse_args(argv)
+
+    try:
+        clp_logging.configure_logging(args.log)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.cycles is None and args.seconds is None:
+        args.cycles = 1000
+
+    try:
+        timer_presets = parse_presets(args.timer, '--timer')
+        counter_presets = parse_presets(args.counter, '--counter')
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+
+    program_lines = load_program_file(args.program)
+    errors = validate_program(program_lines)
+    if errors:
+        print("\n".join(errors), file=sys.stderr)
+        return 1
+
+    if args.truth_table:
+        try:
+            table = generate_truth_table(compile_program(program_lines), include_outputs=args.with_outputs)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        print(format_truth_table(table))
+        return 0
+
+    try:
+        scan_cycle = build_scan_cycle(program_lines, args.backend, timer_presets, counter_presets,
+                                      timebase=TIMEBASES[args.timebase](), change_driven=args.change_driven)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    scan_cycle.inputs = args.inputs
+    if args.stats or args.profile_rungs:
+        budget = args.budget_ms / 1000 if args.budget_ms is not None else None
+        try:
+            scan_cycle.enable_statistics(budget=budget, rung_profiling=args.profile_rungs)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+
+    executed, elapsed = run(scan_cycle, cycles=args.cycles, seconds=args.seconds)
+
+    rate = executed / elapsed if elapsed > 0 else float('inf')
+    print(f"Varreduras: {executed}")
+    print(f"Tempo: {elapsed:.6f} s")
+    print(f"Varreduras/s: {rate:.1f}")
+    print(f"Entradas (I1..I8): {format_bits(scan_cycle.inputs)}")
+    print(f"Saídas   (O1..O8): {format_bits(scan_cycle.outputs)}")
+    print(f"Memórias (B1..B32): {format_bits(scan_cycle.boolean_memories)}")
+    if scan_cycle.statistics is not None:
+        print(format_statistics(scan_cycle.statistics, scan_cycle.compiled_program))
+    if args.backend == 'optimized':
+        report = scan_cycle.optimization_report
+        print(f"Instruções por varredura: {report.original_ops} -> {report.optimized_ops} "
+              f"({report.removed_ops} removidas, {report.hoisted} subexpressões comuns)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,7 @@
-import re
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+import clp_logging
+from components.timebase import MonotonicTimeBase
 from components.timer import Timer
 from components.counter import Counter
 from reverse_polish_notation import logical_structure
@@ -12,19 +13,32 @@ from views import (
     confirm_new,
     file_controller,
 )
-import automata.sentence_interpreter as senInt
 import communication as comm
+from scan_cycle.compiler import LineCompileCache
 from scan_cycle.scan_cycle import ScanCycle
+from scan_cycle.scan_thread import ScanThread
 
 class PLCProgrammer:
     def __init__(self, root):
         self.root = root
         self.root.title("PLC Programmer (Tkinter)")
 
-        self.scan_cycle = ScanCycle(logical_structure=logical_structure.LogicalStructure([]))
+        self.scan_cycle = ScanCycle(
+            logical_structure=logical_structure.LogicalStructure([]),
+            timebase=MonotonicTimeBase(),
+        )
+        # Tempo de varredura exibido na barra de status; o watchdog usa o período de atualização (100 ms)
+        self.scan_cycle.enable_statistics(budget=0.1)
+        # A varredura roda em sua própria thread (período de 100 ms); a interface só enfileira
+        # comandos nela e lê o último snapshot publicado
+        self.scan_thread = ScanThread(self.scan_cycle, period=0.1)
+        # Cache usado apenas para validar o programa na interface (o do ScanCycle é da thread de varredura)
+        self.compile_cache = LineCompileCache()
         self.in_execution = False
         self.is_connected = False
         self.serial_port = comm.initializeSerial()
+        self.transport = None  # comm.SerialTransport enquanto conectado ao Arduino
+        self.stopped_transport = None  # Último transporte encerrado, cuja thread pode ainda estar lendo a porta
 
         # Valores default
         self.timer_values = {f'T{i+1}': 0 for i in range(32)}
@@ -37,7 +51,12 @@ class PLCProgrammer:
 
         # Vars para entradas/saídas
         self.input_vars = [tk.BooleanVar(value=False) for _ in range(8)]
-        self.output_vars = [tk.BooleanVar(value=False) for _ in range(8)]
+        # Estado já desenhado no canvas e texto/cor já aplicados em cada rótulo: a cada quadro
+        # só são reconfigurados os itens cujo valor mudou
+        self.drawn_inputs = [False] * 8
+        self.drawn_outputs = [False] * 8
+        self.label_states = {}
+        self.shown_snapshot = None
 
         self.create_menu()
         self.create_toolbar()
@@ -45,6 +64,14 @@ class PLCProgrammer:
 
         self.update_status_bar()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.scan_thread.start()
+
+    def close(self):
+        self.disconnect_clp()
+        self.scan_thread.stop()
+        self.root.destroy()
+
     def create_scrollable_frame(self, parent):
         # Cria um frame rolável
         container = tk.Frame(parent)
@@ -72,7 +99,7 @@ class PLCProgrammer:
         filemenu.add_command(label="Abrir", accelerator="Ctrl+O", command=self.open_program)
         filemenu.add_command(label="Salvar", accelerator="Ctrl+S", command=self.save_program)
         filemenu.add_separator()
-        filemenu.add_command(label="Sair", command=self.root.quit)
+        filemenu.add_command(label="Sair", command=self.close)
         menubar.add_cascade(label="Arquivo", menu=filemenu)
 
         toolsmenu = tk.Menu(menubar, tearoff=0)
@@ -128,6 +155,8 @@ class PLCProgrammer:
         self.conn_status_label.pack(anchor=tk.W)
         self.exec_status_label = tk.Label(right_frame, text="Status de Execução: Parado", fg="red")
         self.exec_status_label.pack(anchor=tk.W)
+        self.scan_stats_label = tk.Label(right_frame, text="Varredura: -")
+        self.scan_stats_label.pack(anchor=tk.W)
 
         io_frame = tk.LabelFrame(right_frame, text="Entradas/Saídas")
         io_frame.pack(fill=tk.BOTH, expand=True)
@@ -137,7 +166,7 @@ class PLCProgrammer:
 
         self.input_click_areas = []
         self.output_positions = []
-        self.draw_io()
+        self.create_io_items()
 
         self.io_canvas.bind("<Button-1>", self.on_canvas_click)
 
@@ -176,26 +205,19 @@ class PLCProgrammer:
 
         self.root.after(100, self.periodic_update)
 
-    def draw_io(self):
-        self.io_canvas.delete("all")
-        self.input_click_areas.clear()
-        self.output_positions.clear()
+    def create_io_items(self):
+        # Os itens do canvas são criados uma única vez; depois apenas os que mudaram são reconfigurados
+        self.input_items = []
+        self.output_items = []
 
         start_x, start_y = 20, 30
         dist_y = 40
 
         for i in range(8):
             y = start_y + i*dist_y
-            state = self.input_vars[i].get()
-            color = "red" if state else "black"
-
-            if state:
-                line_text = "______"
-            else:
-                line_text = "_/--\\_"
-
-            self.io_canvas.create_text(60, y, text=line_text, font=("Consolas",10), fill=color, anchor="center")
-            self.io_canvas.create_text(60, y+15, text=f"I{i+1}", font=("Consolas",10), fill=color, anchor="center")
+            line_item = self.io_canvas.create_text(60, y, text="_/--\\_", font=("Consolas",10), fill="black", anchor="center")
+            label_item = self.io_canvas.create_text(60, y+15, text=f"I{i+1}", font=("Consolas",10), fill="black", anchor="center")
+            self.input_items.append((line_item, label_item))
 
             text_width = 50
             x1, y1 = 60 - text_width//2, y-10
@@ -206,13 +228,40 @@ class PLCProgrammer:
         start_x_out = 200
         for i in range(8):
             y = start_y + i*dist_y
-            state = self.output_vars[i].get()
-            coil_color = "red" if state else "black"
-            coil_char = "(X)" if state else "( )"
+            self.output_items.append(
+                self.io_canvas.create_text(start_x_out, y, text=f"O{i+1} ( )", font=("Consolas",10), fill="black", anchor="w")
+            )
+            self.output_positions.append((start_x_out, y, start_x_out+50, y+20))
 
-            self.io_canvas.create_text(start_x_out, y, text=f"O{i+1} {coil_char}", font=("Consolas",10), fill=coil_color, anchor="w")
+    def draw_input(self, i):
+        state = self.input_vars[i].get()
+        if state == self.drawn_inputs[i]:
+            return
+        self.drawn_inputs[i] = state
+        color = "red" if state else "black"
+        line_item, label_item = self.input_items[i]
+        self.io_canvas.itemconfig(line_item, text=("______" if state else "_/--\\_"), fill=color)
+        self.io_canvas.itemconfig(label_item, fill=color)
+
+    def draw_outputs(self, outputs):
+        for i, state in enumerate(outputs):
+            if state == self.drawn_outputs[i]:
+                continue
+            self.drawn_outputs[i] = state
+            coil_char = "(X)" if state else "( )"
+            self.io_canvas.itemconfig(self.output_items[i], text=f"O{i+1} {coil_char}",
+                                      fill=("red" if state else "black"))
 
-            self.output_positions.append((start_x_out, y, start_x_out+50, y+20))
+    def set_label(self, label, text, fg=None):
+        # Reconfigura o rótulo apenas se o texto ou a cor mudou desde o último quadro
+        state = (text, fg)
+        if self.label_states.get(label) == state:
+            return
+        self.label_states[label] = state
+        if fg is None:
+            label.config(text=text)
+        else:
+            label.config(text=text, fg=fg)
 
     def on_canvas_click(self, event):
         x, y = event.x, event.y
@@ -222,40 +271,47 @@ class PLCProgrammer:
                 current = self.input_vars[idx].get()
                 self.input_vars[idx].set(not current)
                 self.update_input(idx)
-                self.draw_io()
+                self.draw_input(idx)
                 break
 
     def update_input(self, idx):
-        self.scan_cycle.inputs[idx] = self.input_vars[idx].get()
-        self.scan_cycle.memory_image_inputs[idx] = self.input_vars[idx].get()
+        # A entrada é lida pela thread de varredura no início da próxima varredura
+        self.scan_thread.set_input(idx, self.input_vars[idx].get())
 
     def periodic_update(self):
-        if self.in_execution:
-            self.execute_cycle()
+        snapshot = self.scan_thread.snapshot
+        # Sem nova publicação da thread de varredura desde o último quadro, nada mudou
+        if snapshot is not self.shown_snapshot:
+            self.shown_snapshot = snapshot
+            self.show_snapshot(snapshot)
+        self.root.after(100, self.periodic_update)
 
-        for i, val in enumerate(self.scan_cycle.outputs):
-            self.output_vars[i].set(val)
+    def show_snapshot(self, snapshot):
+        self.draw_outputs(snapshot.outputs)
 
-        self.draw_io()
+        if self.is_connected:
+            # Conectado, as entradas também mudam pelos botões do Arduino
+            for i, val in enumerate(snapshot.inputs):
+                if val != self.drawn_inputs[i]:
+                    self.input_vars[i].set(val)
+                    self.draw_input(i)
 
-        for i, val in enumerate(self.scan_cycle.boolean_memories[:8]):
-            self.boolean_labels[i].config(text=f"B{i+1}: {val}")
+        for i, val in enumerate(snapshot.boolean_memories[:8]):
+            self.set_label(self.boolean_labels[i], f"B{i+1}: {val}")
 
         # Atualiza timers usados
         for (t_type, t_num), l in zip(self.used_timers, self.timer_labels):
-            t_name = f"T{t_num}"
-            timer_value = self.scan_cycle.timers[t_name].remaining_time
-            l.config(text=f"{t_type}{t_num}: {timer_value}")
+            timer_value = snapshot.timers[int(t_num) - 1]
+            self.set_label(l, f"{t_type}{t_num}: {timer_value}")
 
         # Atualiza counters usados
         # Lembre-se que CUP1 e CDN1 referem-se ao contador C1
-        # Então extraímos o número e usamos self.scan_cycle.counters para pegar o count
+        # Então extraímos o número e usamos a contagem de C{número} no snapshot
         for (c_type, c_num), l in zip(self.used_counters, self.counter_labels):
-            c_name = f"C{c_num}"
-            count_value = self.scan_cycle.counters[c_name].count
-            l.config(text=f"{c_type}{c_num}: {count_value}")
+            count_value = snapshot.counters[int(c_num) - 1]
+            self.set_label(l, f"{c_type}{c_num}: {count_value}")
 
-        self.root.after(100, self.periodic_update)
+        self.set_label(self.scan_stats_label, snapshot.status, fg=("red" if snapshot.overruns else "black"))
 
     def update_status_bar(self):
         self.conn_status_label.config(text=f"Status de Conexão: {'Conectado' if self.is_connected else 'Desconectado'}",
@@ -267,7 +323,8 @@ class PLCProgrammer:
         if confirm_new.confirmNewProgram(self.root):
             self.program_text.delete("1.0", tk.END)
             self.in_execution = False
-            self.scan_cycle.initialize_system()
+            self.scan_thread.submit(self.scan_cycle.set_mode, 'STOP')
+            self.scan_thread.submit(self.scan_cycle.initialize_system)
 
     def open_program(self):
         if confirm_new.confirmNewProgram(self.root):
@@ -295,38 +352,42 @@ class PLCProgrammer:
         if not program_text.strip():
             messagebox.showerror("Erro", "A área de programação está vazia.")
             return
-        self.in_execution = False
+        # Com o CLP em execução a compilação é uma edição online: o programa atual continua
+        # rodando até a troca, e um programa com erros não interrompe a execução
+        was_running = self.in_execution
         program_lines = program_text.strip().splitlines()
         errors = []
         self.used_timers.clear()
         self.used_counters.clear()
 
-        for idx, line in enumerate(program_lines):
-            res = senInt.interpretSentence(line)
-            if res == 1:
+        # Apenas linhas novas ou editadas passam pelo autômato; as demais vêm do cache
+        validations = self.compile_cache.validate_program(program_lines)
+        for idx, validation in enumerate(validations):
+            if validation.status == 1:
                 errors.append(f'Erro de sintaxe na linha {idx + 1}')
-            elif res == 2:
+            elif validation.status == 2:
                 errors.append(f'Erro de rótulo na linha {idx + 1}')
 
-            # Procurar por TONx e TOFx
-            found_timers = re.findall(r'(TON|TOF)(\d+)', line.upper())
-            for t_type, t_num in found_timers:
+            # Temporizadores (TONx, TOFx) e contadores (CUPx, CDNx) usados na linha
+            for t_type, t_num in validation.timers:
                 if (t_type, t_num) not in self.used_timers:
                     self.used_timers.append((t_type, t_num))
 
-            # Procurar por contadores CUPx, CDNx
-            found_counters = re.findall(r'(CUP|CDN)(\d+)', line.upper())
-            for c_type, c_num in found_counters:
+            for c_type, c_num in validation.counters:
                 if (c_type, c_num) not in self.used_counters:
                     self.used_counters.append((c_type, c_num))
 
         if errors:
             messagebox.showerror("Erro", "\n".join(errors))
         else:
-            self.scan_cycle.user_program = program_lines
+            if was_running:
+                # Troca atômica entre duas varreduras, preservando imagem, temporizadores e contadores
+                self.scan_thread.submit(self.scan_cycle.hot_swap, program_lines)
+            else:
+                self.scan_thread.submit(self.scan_cycle.load_program, program_lines)
             messagebox.showinfo("Sucesso", "Programa compilado com sucesso!")
 
-            if self.used_timers:
+            if self.used_timers and not was_running:
                 self.timers_need_config = True
                 self.run_button.config(state=tk.DISABLED)
             else:
@@ -335,6 +396,7 @@ class PLCProgrammer:
 
             # Atualiza a aba de temporizadores e contadores utilizados
             for widget in self.timer_frame.winfo_children():
+                self.label_states.pop(widget, None)
                 widget.destroy()
             self.timer_labels.clear()
             for (t_type, t_num) in self.used_timers:
@@ -343,12 +405,14 @@ class PLCProgrammer:
                 self.timer_labels.append(l)
 
             for widget in self.counter_frame.winfo_children():
+                self.label_states.pop(widget, None)
                 widget.destroy()
             self.counter_labels.clear()
             for (c_type, c_num) in self.used_counters:
                 l = tk.Label(self.counter_frame, text=f"{c_type}{c_num}: 0")
                 l.pack(anchor=tk.W)
                 self.counter_labels.append(l)
+            self.shown_snapshot = None  # Preenche os novos rótulos no próximo quadro
 
     def configure_timers(self):
         if not self.used_timers:
@@ -375,7 +439,7 @@ class PLCProgrammer:
                 try:
                     val_int = int(val)
                     self.timer_values[t_name] = val_int
-                    self.scan_cycle.timers[t_name].preset = val_int
+                    self.scan_thread.submit(setattr, self.scan_cycle.timers[t_name], 'preset', val_int)
                 except ValueError:
                     messagebox.showerror("Erro", f"Valor inválido para {t_name}. Insira um número inteiro.")
                     all_valid = False
@@ -412,7 +476,7 @@ class PLCProgrammer:
                     self.counter_values[c_name] = int(val)
                 except:
                     pass
-                self.scan_cycle.counters[c_name].preset = self.counter_values[c_name]
+                self.scan_thread.submit(setattr, self.scan_cycle.counters[c_name], 'preset', self.counter_values[c_name])
             messagebox.showinfo("Sucesso", "Contadores atualizados com sucesso.")
             top.destroy()
 
@@ -420,30 +484,54 @@ class PLCProgrammer:
         tk.Button(top, text="Cancelar", command=top.destroy).grid(row=len(self.used_counters)+1, column=1)
 
     def connect_clp(self):
-        if self.serial_port != 'none':
-            if comm.estabilishConnection(self.serial_port):
-                self.is_connected = True
-            else:
-                self.is_connected = False
-                messagebox.showerror("Erro", "Não foi possível conectar ao dispositivo.")
-        else:
+        if self.serial_port == 'none':
             messagebox.showerror("Erro", "Nenhum dispositivo foi detectado.")
+            self.update_status_bar()
+            return
+        self.disconnect_clp()
+        # A comunicação serial roda na thread do transporte: a interface não espera o Arduino
+        # O novo transporte só usa a porta depois que a thread do anterior terminar
+        self.transport = comm.SerialTransport(self.serial_port, previous=self.stopped_transport).start()
+        self.root.after(50, self.check_connection, self.transport, self.transport.handshake(timeout=5))
+
+    def check_connection(self, transport, handshake):
+        if transport is not self.transport:
+            return  # Conexão cancelada ou substituída enquanto aguardava a resposta
+        if not handshake.done():
+            self.root.after(50, self.check_connection, transport, handshake)
+            return
+        if handshake.exception() is None and handshake.result():
+            self.is_connected = True
+            # A partir daqui a thread de varredura troca saídas e entradas com o Arduino a cada período
+            self.scan_thread.attach_io(self.transport)
+        else:
+            self.disconnect_clp()
+            messagebox.showerror("Erro", "Não foi possível conectar ao dispositivo.")
         self.update_status_bar()
 
+    def disconnect_clp(self):
+        if self.transport is not None:
+            self.scan_thread.attach_io(None)
+            self.transport.stop(timeout=0)  # Não espera: a leitura em andamento termina no seu tempo limite
+            self.stopped_transport = self.transport
+            self.transport = None
+        self.is_connected = False
+
     def run_program(self):
         if self.timers_need_config:
             messagebox.showwarning("Aviso", "Configure primeiro os temporizadores antes de executar.")
             return
-        self.scan_cycle.set_mode('RUN')
+        # As entradas podem ter sido zeradas no último Parar: reenvia o estado atual da interface
+        for idx in range(len(self.input_vars)):
+            self.update_input(idx)
+        self.scan_thread.submit(self.scan_cycle.set_mode, 'RUN')
         self.in_execution = True
         self.update_status_bar()
 
     def stop_program(self):
-        self.scan_cycle.set_mode('STOP')
-        self.scan_cycle.initialize_system()
-        self.update_io_values([False]*8, [False]*8, [False]*32)
+        self.scan_thread.submit(self.reset_plc)
         self.in_execution = False
-        self.is_connected = False
+        self.disconnect_clp()
         self.update_status_bar()
 
     def show_about(self):
@@ -452,13 +540,12 @@ class PLCProgrammer:
     def show_help(self):
         program_help.programHelpWindow(self.root)
 
-    def execute_cycle(self):
-        inputs = [var.get() for var in self.input_vars]
-        self.scan_cycle.inputs = inputs
-        self.scan_cycle.read_inputs()
-        self.scan_cycle.update_timers()
-        self.scan_cycle.process_user_program()
-        self.scan_cycle.update_outputs()
+    def reset_plc(self):
+        # Executado na thread de varredura (ver stop_program)
+        self.scan_cycle.set_mode('STOP')
+        self.scan_cycle.initialize_system()
+        self.scan_cycle.statistics.reset()
+        self.update_io_values([False]*8, [False]*8, [False]*32)
 
     def update_counters(self):
         # Este método incrementa counters no UI, mas o funcionamento real dos counters depende da lógica RPN
@@ -472,6 +559,8 @@ class PLCProgrammer:
             self.scan_cycle.boolean_memories[i] = val
 
 if __name__ == '__main__':
+    # Níveis de log por subsistema via CLP_LOG, ex: CLP_LOG=INFO,serial=DEBUG
+    clp_logging.configure_logging()
     root = tk.Tk()
     app = PLCProgrammer(root)
     root.mainloop()
@@ -1,5 +1,9 @@
+import logging
+
 from .resolve_notation import resolve
 
+logger = logging.getLogger('clp.logical_structure')
+
 class LogicalStructure:
     polishNotations = []
     inputs = [False]*8
@@ -25,31 +29,31 @@ class LogicalStructure:
             identifier = polishTuple[0]
             polish = polishTuple[1]
             resolvedValue = resolve(polish, self.inputs, self.outputs, self.booleans, self.timers_on, self.timers_on_out, self.timers_of, self.timers_of_out, self.counter_up, self.counter_up_out, self.counter_dn, self.counter_dn_out)
-            print(f"\t>RESOLVING: identifier:{identifier} polish:{polish} resolvedValue:{resolvedValue}")
+            logger.debug("\t>RESOLVING: identifier:%s polish:%s resolvedValue:%s", identifier, polish, resolvedValue)
             address = int(identifier[1]) - 1
             if(identifier[0] == 'O'):
                 self.outputs[address] = resolvedValue
             elif(identifier[0] == 'B'):
                 self.booleans[address] = resolvedValue
-        print(f"Outputs updated in LogicalStructure, outputs: {self.outputs}")
+        logger.debug("Outputs updated in LogicalStructure, outputs: %s", self.outputs)
         return self.outputs
 
     def clearPolish(self):
         self.polishNotations.clear()
-        print("Polish notations cleared in LogicalStructure")
+        logger.debug("Polish notations cleared in LogicalStructure")
 
     def updatePolishNotations(self, polishNotations):
         self.clearPolish()
         self.polishNotations = polishNotations
-        print(f"Polish notations updated in LogicalStructure, polishNotations: {self.polishNotations}")
+        logger.debug("Polish notations updated in LogicalStructure, polishNotations: %s", self.polishNotations)
 
     def updateInputs(self, inputs):
         self.inputs = inputs
-        print(f"Inputs updated in LogicalStructure, inputs: {self.inputs}")
+        logger.debug("Inputs updated in LogicalStructure, inputs: %s", self.inputs)
 
     def updateBooleans(self, booleans):
         self.booleans = booleans
-        print(f"Booleans updated in LogicalStructure, booleans: {self.booleans}")
+        logger.debug("Booleans updated in LogicalStructure, booleans: %s", self.booleans)
 
     def updateTimersOn(self, timers):
         self.timers_on = timers
@@ -0,0 +1,168 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: apenas o modo em lote depende dele
+    np = None
+
+from .compiler import compile_program
+from .instructions import (
+    BANK_COUNTER,
+    BANK_TIMER,
+    OP_AND,
+    OP_COUNTER_COIL,
+    OP_LOAD,
+    OP_NOT,
+    OP_OR,
+    OP_STORE,
+    OP_TIMER_COIL,
+    resolve_program,
+)
+
+
+class BatchScanCycle:
+    """
+    Executa N instâncias independentes do mesmo programa de CLP de uma só vez.
+    Cada banco é um array booleano do NumPy com uma linha por cenário (N x 8 para I/O, N x 32 para B),
+    e cada instrução compilada é aplicada como uma operação vetorizada sobre todos os cenários.
+    Temporizadores e contadores também são vetorizados, com a mesma semântica de ScanCycle.
+    """
+
+    def __init__(self, size, program_lines=(), io_count=8, boolean_count=32, timer_count=32, counter_count=8):
+        if np is None:
+            raise ImportError("O modo em lote requer NumPy (pip install numpy).")
+        self.size = size
+        self.cycles = 0
+        self.inputs = np.zeros((size, io_count), dtype=bool)
+        self.outputs = np.zeros((size, io_count), dtype=bool)
+        self.memory_image_inputs = np.zeros((size, io_count), dtype=bool)
+        self.memory_image_outputs = np.zeros((size, io_count), dtype=bool)
+        self.boolean_memories = np.zeros((size, boolean_count), dtype=bool)
+
+        # Temporizadores: o preset pode ser ajustado por temporizador (coluna) ou por cenário
+        self.timer_presets = np.zeros((size, timer_count), dtype=np.int64)
+        self.timer_remaining = np.zeros((size, timer_count), dtype=np.int64)
+        self.timer_active = np.zeros((size, timer_count), dtype=bool)
+        self.timer_triggered = np.zeros((size, timer_count), dtype=bool)
+        self.timer_on_delay = np.ones(timer_count, dtype=bool)  # False = OFF DELAY
+
+        # Contadores: todos os contadores de ScanCycle são do tipo 'UP'
+        self.counter_counts = np.zeros((size, counter_count), dtype=np.int64)
+        self.counter_up = np.ones(counter_count, dtype=bool)
+        self.counter_coils = {}
+        self.prev_counter_coils = {}
+
+        self.compiled_program = ()
+        self.resolved_program = ()
+        self.load_program(program_lines)
+
+    @classmethod
+    def from_scan_cycle(cls, scan_cycle, size):
+        """
+        Cria um lote com o programa e os presets de temporizadores de um ScanCycle.
+        """
+        batch = cls(size, timer_count=len(scan_cycle.timer_list), counter_count=len(scan_cycle.counter_list))
+        batch.compiled_program = scan_cycle.compiled_program
+        batch.resolved_program = resolve_program(scan_cycle.compiled_program)
+        batch.timer_presets[:] = [timer.preset for timer in scan_cycle.timer_list]
+        batch.counter_up[:] = [counter.type == 'UP' for counter in scan_cycle.counter_list]
+        return batch
+
+    def load_program(self, program_lines):
+        """
+        Compila o programa do usuário para a forma vetorizada.
+        """
+        self.compiled_program = compile_program(program_lines)
+        self.resolved_program = resolve_program(self.compiled_program)
+
+    def read_inputs(self):
+        self.memory_image_inputs = self.inputs.copy()
+
+    def update_outputs(self):
+        self.outputs = self.memory_image_outputs.copy()
+
+    def update_timers(self):
+        """
+        Decrementa todos os temporizadores ativos e trata os que chegaram a zero.
+        """
+        ticking = self.timer_active & (self.timer_remaining > 0)
+        self.timer_remaining -= ticking
+        done = ticking & (self.timer_remaining == 0)
+        self.timer_active &= ~done
+        # ON DELAY aciona a saída ao terminar; OFF DELAY desliga
+        self.timer_triggered = np.where(done, self.timer_on_delay, self.timer_triggered)
+
+    def process_user_program(self):
+        banks = (self.memory_image_inputs, self.memory_image_outputs, self.boolean_memories)
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for opcode, arg1, arg2 in self.resolved_program:
+            if opcode == OP_LOAD:
+                if arg1 == BANK_TIMER:
+                    push(self.timer_triggered[:, arg2])
+                elif arg1 == BANK_COUNTER:
+                    push(self.counter_counts[:, arg2] > 0)
+                else:
+                    push(banks[arg1][:, arg2])
+            elif opcode == OP_AND:
+                operand2 = pop()
+                push(pop() & operand2)
+            elif opcode == OP_OR:
+                operand2 = pop()
+                push(pop() | operand2)
+            elif opcode == OP_NOT:
+                push(~pop())
+            elif opcode == OP_STORE:
+                banks[arg1][:, arg2] = pop()
+            elif opcode == OP_TIMER_COIL:
+                self._apply_timer_coil(arg1, arg2, pop())
+            elif opcode == OP_COUNTER_COIL:
+                self.counter_coils[arg1] = (arg2, arg1.startswith('CUP'), pop().copy())
+
+    def _start_timers(self, index, mask, triggered):
+        self.timer_remaining[mask, index] = self.timer_presets[mask, index]
+        self.timer_active[mask, index] = True
+        self.timer_triggered[mask, index] = triggered
+
+    def _apply_timer_coil(self, index, timer_type, coil):
+        """
+        Versão vetorizada de ScanCycle._apply_timer_coil para a coluna 'index'.
+        """
+        active = self.timer_active[:, index]
+        triggered = self.timer_triggered[:, index]
+        if timer_type == 'TON':
+            self.timer_on_delay[index] = True
+            start = coil & ~active & ~triggered
+            reset = ~coil & (active | triggered)
+            self._start_timers(index, start, False)
+            self.timer_active[reset, index] = False
+            self.timer_remaining[reset, index] = self.timer_presets[reset, index]
+            self.timer_triggered[reset, index] = False
+        else:
+            self.timer_on_delay[index] = False
+            stop = coil & active
+            start = ~coil & triggered & ~active
+            self.timer_triggered[coil, index] = True
+            self.timer_active[stop, index] = False
+            self.timer_remaining[stop, index] = self.timer_presets[stop, index]
+            self._start_timers(index, start, True)
+
+    def _process_counters_coils(self):
+        for coil_name, (index, is_up, current) in self.counter_coils.items():
+            previous = self.prev_counter_coils.get(coil_name)
+            rising = current if previous is None else current & ~previous[2]
+            if is_up and self.counter_up[index]:
+                self.counter_counts[:, index] += rising
+            elif not is_up and not self.counter_up[index]:
+                self.counter_counts[:, index] -= rising
+
+    def scan(self):
+        """
+        Executa um ciclo de varredura em todos os cenários ao mesmo tempo.
+        """
+        self.read_inputs()
+        self.update_timers()
+        self.process_user_program()
+        self._process_counters_coils()
+        self.update_outputs()
+        self.cycles += 1
+        self.prev_counter_coils = self.counter_coils.copy()
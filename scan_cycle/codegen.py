@@ -0,0 +1,166 @@
+from functools import lru_cache
+
+from .instructions import (
+    BANK_BOOLEAN,
+    BANK_COUNTER,
+    BANK_INPUT,
+    BANK_OUTPUT,
+    BANK_TIMER,
+    OP_AND,
+    OP_LOAD,
+    OP_NOT,
+    OP_STORE,
+    OP_TIMER_COIL,
+    resolve_rung,
+)
+
+FUNCTION_NAME = 'run_program'
+# Parâmetros da função gerada, na ordem em que ScanCycle os passa
+FUNCTION_ARGS = ('mi', 'mo', 'b', 'timers', 'counters', 'counter_coils', 'apply_timer_coil')
+
+BANK_NAMES = {BANK_INPUT: 'mi', BANK_OUTPUT: 'mo', BANK_BOOLEAN: 'b'}
+
+
+def _operand_source(bank, index):
+    if bank == BANK_TIMER:
+        return f"timers[{index}].triggered"
+    if bank == BANK_COUNTER:
+        return f"(counters[{index}].count > 0)"
+    return f"{BANK_NAMES[bank]}[{index}]"
+
+
+# Níveis máximos de parênteses em uma expressão gerada. Subexpressões mais profundas são calculadas
+# antes, em variáveis temporárias: o parser do Python recusa expressões com mais de 200 níveis
+MAX_NESTING = 50
+
+
+def _expression_source(code, operand_source, not_format, and_separator, or_separator):
+    """
+    Monta a expressão Python de uma linha a partir das instruções resolvidas (sem a instrução final).
+    Cadeias de um mesmo operador são emitidas sem parênteses internos (a and b and c), então a
+    profundidade da expressão segue o aninhamento de grupos do programa, e não o número de termos.
+    Retorna (atribuições de temporárias, expressão); a expressão é um operando ou está entre parênteses.
+    """
+    assignments = []
+
+    def operand(item, opcode=None):
+        # Texto do item como operando de 'opcode', com parênteses se ele for de outro operador
+        text, item_opcode, depth = item
+        if item_opcode is None or item_opcode == opcode:
+            return text, depth
+        if depth >= MAX_NESTING:
+            name = f"_t{len(assignments)}"
+            assignments.append(f"{name} = {text}")
+            return name, 0
+        return f"({text})", depth + 1
+
+    # Cada item da pilha: (texto, opcode do operador mais externo ou None para operandos, profundidade)
+    stack = []
+    for opcode, arg1, arg2 in code:
+        if opcode == OP_LOAD:
+            stack.append((operand_source(arg1, arg2), None, 0))
+        elif opcode == OP_NOT:
+            text, depth = operand(stack.pop())
+            stack.append((not_format.format(text), OP_NOT, depth))
+        else:
+            operand2, depth2 = operand(stack.pop(), opcode)
+            operand1, depth1 = operand(stack.pop(), opcode)
+            separator = and_separator if opcode == OP_AND else or_separator
+            stack.append((f"{operand1}{separator}{operand2}", opcode, max(depth1, depth2)))
+    text, _ = operand(stack.pop())
+    return assignments, text
+
+
+def _statements(assignments, statement):
+    # Uma linha do programa vira uma única linha de código: temporárias; instrução final
+    return '; '.join(assignments + [statement])
+
+
+@lru_cache(maxsize=4096)
+def rung_source(rung):
+    """
+    Traduz uma linha compilada em uma linha de código Python equivalente.
+    Ex: O3 = (I1 | O3) ^ !I2  ->  mo[2] = ((mi[0] or mo[2]) and (not mi[1]))
+    """
+    code = resolve_rung(rung)
+    assignments, expression = _expression_source(code[:-1], _operand_source, "not {}", " and ", " or ")
+
+    opcode, arg1, arg2 = code[-1]
+    if opcode == OP_STORE:
+        return _statements(assignments, f"{BANK_NAMES[arg1]}[{arg2}] = {expression}")
+    if opcode == OP_TIMER_COIL:
+        return _statements(assignments, f"apply_timer_coil(timers[{arg1}], {arg2!r}, {expression})")
+    return _statements(assignments, f"counter_coils[{arg1!r}] = {expression}")
+
+
+def generate_source(compiled_program):
+    """
+    Gera o código-fonte de uma função que executa todo o programa em uma única chamada.
+    """
+    lines = [f"def {FUNCTION_NAME}({', '.join(FUNCTION_ARGS)}):"]
+    for rung in compiled_program:
+        lines.append(f"    {rung_source(rung)}")
+    if len(lines) == 1:
+        lines.append("    pass")
+    return "\n".join(lines) + "\n"
+
+
+def _packed_operand_source(bank, index):
+    if bank == BANK_TIMER:
+        return f"timers[{index}].triggered"
+    if bank == BANK_COUNTER:
+        return f"(counters[{index}].count > 0)"
+    return f"({BANK_NAMES[bank]} >> {index} & 1)"
+
+
+@lru_cache(maxsize=4096)
+def packed_rung_source(rung):
+    """
+    Traduz uma linha compilada em código Python sobre a imagem de processo compactada em inteiros,
+    onde cada banco (mi, mo, b) é uma máscara de bits e o bit k corresponde ao endereço k+1.
+    Ex: O3 = (I1 | O3) ^ !I2  ->  mo = mo & ~4 | (((mi >> 0 & 1) | (mo >> 2 & 1)) & ((mi >> 1 & 1) ^ 1)) << 2
+    """
+    code = resolve_rung(rung)
+    assignments, expression = _expression_source(code[:-1], _packed_operand_source, "{} ^ 1", " & ", " | ")
+
+    opcode, arg1, arg2 = code[-1]
+    if opcode == OP_STORE:
+        name = BANK_NAMES[arg1]
+        return _statements(assignments, f"{name} = {name} & ~{1 << arg2} | {expression} << {arg2}")
+    if opcode == OP_TIMER_COIL:
+        return _statements(assignments, f"apply_timer_coil(timers[{arg1}], {arg2!r}, {expression})")
+    return _statements(assignments, f"counter_coils[{arg1!r}] = bool({expression})")
+
+
+def generate_packed_source(compiled_program):
+    """
+    Gera o código-fonte da função do programa para a imagem compactada.
+    A função retorna as novas máscaras (mo, b), já que inteiros são imutáveis.
+    """
+    lines = [f"def {FUNCTION_NAME}({', '.join(FUNCTION_ARGS)}):"]
+    for rung in compiled_program:
+        lines.append(f"    {packed_rung_source(rung)}")
+    lines.append("    return mo, b")
+    return "\n".join(lines) + "\n"
+
+
+def _build_function(source):
+    namespace = {}
+    exec(compile(source, '<programa do usuário>', 'exec'), namespace)
+    return namespace[FUNCTION_NAME]
+
+
+def generate_program(compiled_program):
+    """
+    Compila (com compile()) o código gerado e retorna (função, código-fonte).
+    """
+    source = generate_source(compiled_program)
+    return _build_function(source), source
+
+
+def generate_packed_program(compiled_program):
+    """
+    Compila o código gerado para a imagem compactada e retorna (função, código-fonte).
+    """
+    source = generate_packed_source(compiled_program)
+    return _build_function(source), source
@@ -0,0 +1,151 @@
+import logging
+import re
+from collections import namedtuple
+
+import automata.sentence_interpreter as senInt
+from automata.lexer import lex
+
+logger = logging.getLogger('clp.compiler')
+
+# Uma linha compilada do programa do usuário: o identificador de destino (O, B, TON, TOF, CUP, CDN)
+# e as instruções em RPN, terminadas pelo próprio identificador, prontas para _execute_rpn
+CompiledRung = namedtuple('CompiledRung', ['identifier', 'instructions'])
+
+# Resultado da validação de uma linha: status de interpretSentence (0 = ok, 1 = sintaxe, 2 = rótulo)
+# e os temporizadores/contadores usados, como pares (tipo, número), ex: ('TON', '1')
+LineValidation = namedtuple('LineValidation', ['status', 'timers', 'counters'])
+
+PRECEDENCE = {'NOT': 3, '^': 2, '|': 1}
+ASSOCIATIVITY = {'NOT': 'right', '^': 'left', '|': 'left'}
+
+
+def convert_to_rpn(expression):
+    """
+    Converte uma expressão lógica em RPN usando um algoritmo tipo Shunting Yard simplificado.
+    Os tokens vêm do mesmo lexer usado na validação (automata.lexer). Os limites de endereço
+    não são verificados aqui, pois dependem do ScanCycle (ex: timer_count).
+    """
+    output_queue = []
+    operator_stack = []
+
+    for lexed in lex(expression, limits=None):
+        token = lexed.text
+        token_upper = 'NOT' if token == '!' else token
+        if token_upper in PRECEDENCE:
+            while (operator_stack and operator_stack[-1] != '(' and
+                   ((ASSOCIATIVITY[token_upper] == 'left' and PRECEDENCE[token_upper] <= PRECEDENCE[operator_stack[-1]]) or
+                    (ASSOCIATIVITY[token_upper] == 'right' and PRECEDENCE[token_upper] < PRECEDENCE[operator_stack[-1]]))):
+                output_queue.append(operator_stack.pop())
+            operator_stack.append(token_upper)
+        elif token == '(':
+            operator_stack.append(token)
+        elif token == ')':
+            while operator_stack and operator_stack[-1] != '(':
+                output_queue.append(operator_stack.pop())
+            operator_stack.pop()  # Remove '('
+        else:
+            output_queue.append(token_upper)
+    while operator_stack:
+        output_queue.append(operator_stack.pop())
+
+    return output_queue
+
+
+def parse_line(line):
+    """
+    Separa uma linha do programa em (identificador, expressão).
+    Retorna None para linhas vazias, comentários ou linhas sem atribuição.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None  # Linhas vazias ou comentários
+    if '=' not in line:
+        logger.warning("Linha inválida: %s", line)
+        return None
+    identifier, expression = line.split('=', 1)
+    # Espaços são ignorados também dentro dos rótulos, como no lexer (ex: 'TON 1' = TON1)
+    return ''.join(identifier.split()).upper(), expression.strip()
+
+
+def compile_line(line):
+    """
+    Compila uma única linha do programa. Retorna um CompiledRung ou None se a linha não gera código.
+    """
+    parsed = parse_line(line)
+    if parsed is None:
+        return None
+    identifier, expression = parsed
+    rpn_instructions = convert_to_rpn(expression)
+    # Adiciona o identificador para definir a saída ou memória no final
+    rpn_instructions.append(identifier)
+    return CompiledRung(identifier, tuple(rpn_instructions))
+
+
+def compile_program(program_lines):
+    """
+    Compila todas as linhas do programa do usuário em uma tupla imutável de CompiledRung.
+    """
+    compiled = []
+    for line in program_lines:
+        rung = compile_line(line)
+        if rung is not None:
+            compiled.append(rung)
+    return tuple(compiled)
+
+
+class LineCompileCache:
+    """
+    Cache de compilação por linha, indexado pelo conteúdo da linha.
+    Ao recompilar um programa, apenas as linhas novas ou editadas são validadas e compiladas;
+    as demais reutilizam o resultado anterior. Entradas de linhas que saíram do programa são descartadas.
+    """
+
+    def __init__(self):
+        self._validations = {}
+        self._rungs = {}
+
+    def validate(self, line):
+        """
+        Valida uma linha com o autômato e identifica os temporizadores e contadores usados.
+        """
+        validation = self._validations.get(line)
+        if validation is None:
+            upper = ''.join(line.upper().split())
+            validation = LineValidation(
+                senInt.interpretSentence(line),
+                tuple(re.findall(r'(TON|TOF)(\d+)', upper)),
+                tuple(re.findall(r'(CUP|CDN)(\d+)', upper)),
+            )
+            self._validations[line] = validation
+        return validation
+
+    def validate_program(self, program_lines):
+        """
+        Valida todas as linhas e retorna a lista de LineValidation, na ordem do programa.
+        """
+        validations = [self.validate(line) for line in program_lines]
+        self._prune(self._validations, program_lines)
+        return validations
+
+    def compile_line(self, line):
+        if line not in self._rungs:
+            self._rungs[line] = compile_line(line)
+        return self._rungs[line]
+
+    def compile_program(self, program_lines):
+        """
+        Mesmo resultado de compile_program, reaproveitando as linhas já compiladas.
+        """
+        compiled = []
+        for line in program_lines:
+            rung = self.compile_line(line)
+            if rung is not None:
+                compiled.append(rung)
+        self._prune(self._rungs, program_lines)
+        return tuple(compiled)
+
+    def _prune(self, entries, program_lines):
+        if len(entries) > len(program_lines):
+            current = set(program_lines)
+            for line in [line for line in entries if line not in current]:
+                del entries[line]
@@ -0,0 +1,138 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Bancos de memória endereçáveis pelos operandos
+BANK_INPUT = 0    # Memória imagem das entradas (Ix)
+BANK_OUTPUT = 1   # Memória imagem das saídas (Ox)
+BANK_BOOLEAN = 2  # Memórias booleanas (Bx)
+BANK_TIMER = 3    # Contatos de temporizadores (TONOx, TOFOx)
+BANK_COUNTER = 4  # Contatos de contadores (CUPOx, CDNOx)
+
+# Códigos de operação. Cada instrução é uma tupla (opcode, arg1, arg2)
+OP_LOAD = 0           # Empilha o valor de (banco, índice)
+OP_NOT = 1
+OP_AND = 2
+OP_OR = 3
+OP_STORE = 4          # Desempilha e grava em (banco, índice) - apenas saídas e memórias
+OP_TIMER_COIL = 5     # Desempilha e aciona a bobina do temporizador (índice, 'TON' ou 'TOF')
+OP_COUNTER_COIL = 6   # Desempilha e registra o estado da bobina de contador (nome da bobina, índice)
+
+OPERATOR_OPCODES = {'NOT': OP_NOT, '^': OP_AND, '|': OP_OR}
+
+# Dependências de uma linha para a execução orientada a mudanças:
+# expression: instruções que calculam o valor; target: instrução final (STORE ou bobina)
+# reads/writes: endereços (banco, índice) lidos e escritos pela linha
+# watched: reads + writes. Uma linha também é reavaliada quando outra linha grava no seu destino
+RungDependencies = namedtuple('RungDependencies', ['expression', 'target', 'reads', 'writes', 'watched'])
+
+OPERAND_PATTERN = re.compile(r'^(TONO|TOFO|CUPO|CDNO|CUP|CDN|I|O|B)(\d+)$')
+TARGET_PATTERN = re.compile(r'^(TON|TOF|CUP|CDN|O|B)(\d+)$')
+
+OPERAND_BANKS = {
+    'I': BANK_INPUT,
+    'O': BANK_OUTPUT,
+    'B': BANK_BOOLEAN,
+    'TONO': BANK_TIMER,
+    'TOFO': BANK_TIMER,
+    'CUPO': BANK_COUNTER,
+    'CDNO': BANK_COUNTER,
+    'CUP': BANK_COUNTER,
+    'CDN': BANK_COUNTER,
+}
+
+
+def resolve_operand(token):
+    """
+    Resolve um token de operando (ex: I3, TONO2) para o par (banco, índice).
+    """
+    match = OPERAND_PATTERN.match(token.upper())
+    if not match:
+        raise ValueError(f"Token desconhecido: {token}")
+    return OPERAND_BANKS[match.group(1)], int(match.group(2)) - 1
+
+
+def resolve_target(identifier):
+    """
+    Converte o identificador de destino de uma linha na instrução final correspondente.
+    """
+    match = TARGET_PATTERN.match(identifier.upper())
+    if not match:
+        raise ValueError(f"Token de saída desconhecido: {identifier}")
+    kind = match.group(1)
+    index = int(match.group(2)) - 1
+    if kind == 'O':
+        return (OP_STORE, BANK_OUTPUT, index)
+    if kind == 'B':
+        return (OP_STORE, BANK_BOOLEAN, index)
+    if kind in ('TON', 'TOF'):
+        return (OP_TIMER_COIL, index, kind)
+    return (OP_COUNTER_COIL, f"{kind}{index + 1}", index)
+
+
+@lru_cache(maxsize=4096)
+def resolve_rung(rung):
+    """
+    Converte um CompiledRung (RPN em texto) em uma tupla de instruções com operandos resolvidos.
+    O resultado é imutável e fica em cache, então linhas inalteradas não são resolvidas de novo.
+    """
+    code = []
+    for token in rung.instructions[:-1]:
+        if token in OPERATOR_OPCODES:
+            code.append((OPERATOR_OPCODES[token], None, None))
+        else:
+            bank, index = resolve_operand(token)
+            code.append((OP_LOAD, bank, index))
+    code.append(resolve_target(rung.identifier))
+    return tuple(code)
+
+
+def resolve_program(compiled_program):
+    """
+    Resolve todas as linhas do programa em uma única sequência de instruções.
+    """
+    code = []
+    for rung in compiled_program:
+        code.extend(resolve_rung(rung))
+    return tuple(code)
+
+
+def program_references(compiled_program):
+    """
+    Retorna os temporizadores e contadores referenciados (como bobina ou contato) pelo programa:
+    (índices de temporizadores, índices de contadores, nomes das bobinas de contador).
+    """
+    timers = set()
+    counters = set()
+    counter_coils = set()
+    for rung in compiled_program:
+        for opcode, arg1, arg2 in resolve_rung(rung):
+            if opcode == OP_LOAD and arg1 == BANK_TIMER:
+                timers.add(arg2)
+            elif opcode == OP_LOAD and arg1 == BANK_COUNTER:
+                counters.add(arg2)
+            elif opcode == OP_TIMER_COIL:
+                timers.add(arg1)
+            elif opcode == OP_COUNTER_COIL:
+                counters.add(arg2)
+                counter_coils.add(arg1)
+    return timers, counters, counter_coils
+
+
+@lru_cache(maxsize=4096)
+def analyze_rung(rung):
+    """
+    Calcula as instruções e os conjuntos de leitura e escrita de uma linha compilada.
+    Bobinas de temporizador escrevem no contato do temporizador (BANK_TIMER, índice) e
+    bobinas de contador no contato do contador (BANK_COUNTER, índice).
+    """
+    code = resolve_rung(rung)
+    reads = tuple(sorted({(arg1, arg2) for opcode, arg1, arg2 in code if opcode == OP_LOAD}))
+    opcode, arg1, arg2 = code[-1]
+    if opcode == OP_STORE:
+        writes = ((arg1, arg2),)
+    elif opcode == OP_TIMER_COIL:
+        writes = ((BANK_TIMER, arg1),)
+    else:
+        writes = ((BANK_COUNTER, arg2),)
+    return RungDependencies(code[:-1], code[-1], reads, writes, reads + writes)
@@ -0,0 +1,208 @@
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+from .instructions import (
+    BANK_INPUT,
+    OP_AND,
+    OP_LOAD,
+    OP_NOT,
+    OP_STORE,
+    resolve_rung,
+)
+
+# Banco das subexpressões comuns calculadas uma vez no início da varredura
+BANK_TEMP = 5
+OP_CONST = 7  # Empilha o valor constante arg1
+# Avaliação em curto-circuito: arg1 é a posição de destino no programa. Se o topo da pilha já
+# decide o resultado (falso no AND, verdadeiro no OR) salta mantendo-o; senão desempilha e segue
+OP_JUMP_IF_FALSE_OR_POP = 8
+OP_JUMP_IF_TRUE_OR_POP = 9
+
+# Resultado da otimização: instruções executadas por varredura antes e depois,
+# instruções removidas e quantidade de subexpressões comuns movidas para o início do programa
+OptimizationReport = namedtuple('OptimizationReport', ['original_ops', 'optimized_ops', 'removed_ops', 'hoisted'])
+
+# Nós da expressão (tuplas comparáveis, então expressões iguais são o mesmo nó do DAG):
+# ('const', valor), ('load', banco, índice), ('not', x), ('and', a, b), ('or', a, b)
+TRUE = ('const', True)
+FALSE = ('const', False)
+
+
+def _not(node):
+    if node[0] == 'const':
+        return FALSE if node[1] else TRUE
+    if node[0] == 'not':
+        return node[1]  # !!x -> x
+    return ('not', node)
+
+
+def _and(left, right):
+    for constant, other in ((left, right), (right, left)):
+        if constant[0] == 'const':
+            return other if constant[1] else FALSE
+    if left == right:
+        return left
+    if left == _not(right):
+        return FALSE  # x ^ !x
+    return ('and', left, right)
+
+
+def _or(left, right):
+    for constant, other in ((left, right), (right, left)):
+        if constant[0] == 'const':
+            return TRUE if constant[1] else other
+    if left == right:
+        return left
+    if left == _not(right):
+        return TRUE  # x | !x
+    return ('or', left, right)
+
+
+def build_expression(code):
+    """
+    Converte as instruções resolvidas de uma expressão em um nó simplificado
+    (constantes e duplas negações são eliminadas na construção).
+    """
+    stack = []
+    for opcode, arg1, arg2 in code:
+        if opcode == OP_LOAD:
+            stack.append(('load', arg1, arg2))
+        elif opcode == OP_NOT:
+            stack.append(_not(stack.pop()))
+        else:
+            right = stack.pop()
+            left = stack.pop()
+            stack.append(_and(left, right) if opcode == OP_AND else _or(left, right))
+    return stack.pop()
+
+
+# As funções abaixo percorrem as expressões com pilhas explícitas, como build_expression:
+# uma linha longa (ex: centenas de termos em sequência) passa do limite de recursão do Python
+
+
+def _properties(nodes):
+    """
+    Retorna {nó: (tamanho em instruções, depende apenas das entradas)} para os nós e seus filhos.
+    """
+    properties = {}
+    stack = list(nodes)
+    while stack:
+        node = stack[-1]
+        if node in properties:
+            stack.pop()
+        elif node[0] == 'const':
+            properties[stack.pop()] = (1, True)
+        elif node[0] == 'load':
+            properties[stack.pop()] = (1, node[1] == BANK_INPUT)
+        else:
+            pending = [child for child in node[1:] if child not in properties]
+            if pending:
+                stack.extend(pending)
+                continue
+            children = [properties[child] for child in node[1:]]
+            properties[stack.pop()] = (
+                1 + sum(size for size, _ in children),
+                all(inputs_only for _, inputs_only in children),
+            )
+    return properties
+
+
+def _subtrees(node, counts):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        counts[node] += 1
+        if node[0] not in ('const', 'load'):
+            stack.extend(node[1:])
+    return counts
+
+
+def _choose_hoisted(expressions):
+    """
+    Escolhe as subexpressões que dependem apenas das entradas e que compensa calcular uma vez:
+    n ocorrências de tamanho s custam n * s instruções; hoisting custa s + 1 (cálculo e gravação)
+    mais n leituras.
+    """
+    counts = Counter()
+    for expression in expressions:
+        _subtrees(expression, counts)
+    properties = _properties(counts)
+    candidates = sorted(
+        (node for node in counts if node[0] not in ('const', 'load') and properties[node][1]),
+        key=lambda node: properties[node][0],
+        reverse=True,
+    )
+    hoisted = []
+    for node in candidates:
+        occurrences = counts[node]
+        size = properties[node][0]
+        if occurrences * size <= size + 1 + occurrences:
+            continue
+        hoisted.append(node)
+        # As ocorrências internas passam a ser calculadas uma única vez, dentro do temporário
+        for inner, inner_count in _subtrees(node, Counter()).items():
+            if inner != node:
+                counts[inner] -= (occurrences - 1) * inner_count
+    return sorted(hoisted, key=lambda node: properties[node][0])
+
+
+def _emit(node, temps, code):
+    # Além dos nós, a pilha guarda marcadores: ('_op', instrução) emite a instrução;
+    # ('_jump', opcode, posição) reserva a posição do salto e ('_target', opcode, posição) o completa
+    work = [node]
+    while work:
+        item = work.pop()
+        kind = item[0]
+        if kind == '_op':
+            code.append(item[1])
+        elif kind == '_jump':
+            item[2].append(len(code))
+            code.append(None)
+        elif kind == '_target':
+            code[item[2][0]] = (item[1], len(code), None)
+        elif item in temps:
+            code.append((OP_LOAD, BANK_TEMP, temps[item]))
+        elif kind == 'const':
+            code.append((OP_CONST, item[1], None))
+        elif kind == 'load':
+            code.append((OP_LOAD, item[1], item[2]))
+        elif kind == 'not':
+            work.append(('_op', (OP_NOT, None, None)))
+            work.append(item[1])
+        else:
+            # O operando da direita só é avaliado quando o da esquerda não decide o resultado.
+            # O salto termina antes da instrução final da linha, então bobinas sempre são executadas
+            opcode = OP_JUMP_IF_FALSE_OR_POP if kind == 'and' else OP_JUMP_IF_TRUE_OR_POP
+            position = []
+            work.extend((('_target', opcode, position), item[2], ('_jump', opcode, position), item[1]))
+
+
+@lru_cache(maxsize=32)
+def optimize_program(compiled_program):
+    """
+    Otimiza o programa inteiro sobre um DAG de expressões: dobra constantes e duplas negações,
+    simplifica x^x, x|x, x^!x e x|!x, e calcula uma única vez, no início da varredura,
+    as subexpressões comuns que dependem apenas da memória imagem das entradas (que não muda
+    durante a execução do programa). AND e OR são emitidos como saltos em curto-circuito.
+    Retorna (instruções, OptimizationReport); as posições de salto são absolutas no programa.
+    """
+    original_ops = 0
+    rungs = []
+    for rung in compiled_program:
+        code = resolve_rung(rung)
+        original_ops += len(code)
+        rungs.append((build_expression(code[:-1]), code[-1]))
+
+    hoisted = _choose_hoisted([expression for expression, _ in rungs])
+    temps = {}
+    code = []
+    for node in hoisted:
+        _emit(node, temps, code)
+        temps[node] = len(temps)
+        code.append((OP_STORE, BANK_TEMP, temps[node]))
+    for expression, target in rungs:
+        _emit(expression, temps, code)
+        code.append(target)
+
+    report = OptimizationReport(original_ops, len(code), original_ops - len(code), len(hoisted))
+    return tuple(code), report
@@ -0,0 +1,113 @@
+from .codegen import generate_packed_program
+from .scan_cycle import ScanCycle
+
+IO_WIDTH = 8         # Bits das entradas e saídas (I1..I8, O1..O8)
+BOOLEAN_WIDTH = 32   # Bits das memórias booleanas (B1..B32)
+
+
+def pack_bits(values):
+    """
+    Converte uma lista de booleanos em uma máscara de bits (índice 0 -> bit 0).
+    """
+    bits = 0
+    for i, value in enumerate(values):
+        if value:
+            bits |= 1 << i
+    return bits
+
+
+def unpack_bits(bits, width):
+    """
+    Converte uma máscara de bits em uma lista de booleanos com 'width' posições.
+    """
+    return [bool(bits >> i & 1) for i in range(width)]
+
+
+class PackedScanCycle(ScanCycle):
+    """
+    Ciclo de varredura com a imagem de processo compactada: cada banco (entradas, saídas,
+    memórias imagem e memórias B) é um único inteiro usado como máscara de bits.
+    As linhas do programa são avaliadas com operações bit a bit e as transferências de imagem
+    são atribuições de um inteiro. As propriedades em lista (inputs, outputs, ...) são mantidas
+    por compatibilidade, mas criam uma nova lista a cada acesso: use set_input para alterar entradas.
+    """
+    BACKENDS = ('packed',)
+
+    def __init__(self, logical_structure, backend='packed', timer_count=32, timebase=None):
+        super().__init__(logical_structure, backend=backend, timer_count=timer_count, timebase=timebase)
+
+    @property
+    def inputs(self):
+        return unpack_bits(self.input_bits, IO_WIDTH)
+
+    @inputs.setter
+    def inputs(self, values):
+        self.input_bits = pack_bits(values)
+
+    @property
+    def outputs(self):
+        return unpack_bits(self.output_bits, IO_WIDTH)
+
+    @outputs.setter
+    def outputs(self, values):
+        self.output_bits = pack_bits(values)
+
+    @property
+    def memory_image_inputs(self):
+        return unpack_bits(self.image_input_bits, IO_WIDTH)
+
+    @memory_image_inputs.setter
+    def memory_image_inputs(self, values):
+        self.image_input_bits = pack_bits(values)
+
+    @property
+    def memory_image_outputs(self):
+        return unpack_bits(self.image_output_bits, IO_WIDTH)
+
+    @memory_image_outputs.setter
+    def memory_image_outputs(self, values):
+        self.image_output_bits = pack_bits(values)
+
+    @property
+    def boolean_memories(self):
+        return unpack_bits(self.boolean_bits, BOOLEAN_WIDTH)
+
+    @boolean_memories.setter
+    def boolean_memories(self, values):
+        self.boolean_bits = pack_bits(values)
+
+    def _build_backend(self, compiled_program):
+        """
+        Gera a função do programa que opera diretamente sobre as máscaras de bits.
+        """
+        generated_program, generated_source = generate_packed_program(compiled_program)
+        return (), generated_program, generated_source
+
+    def set_input(self, index, value):
+        if value:
+            self.input_bits |= 1 << index
+        else:
+            self.input_bits &= ~(1 << index)
+
+    def led_byte(self):
+        return self.output_bits
+
+    def read_inputs(self):
+        if self.mode == 'RUN':
+            self.image_input_bits = self.input_bits
+
+    def process_user_program(self):
+        if self.mode == 'RUN':
+            self.image_output_bits, self.boolean_bits = self.generated_program(
+                self.image_input_bits,
+                self.image_output_bits,
+                self.boolean_bits,
+                self.timer_list,
+                self.counter_list,
+                self.counter_coils,
+                self._apply_timer_coil,
+            )
+
+    def update_outputs(self):
+        if self.mode == 'RUN':
+            self.output_bits = self.image_output_bits
@@ -0,0 +1,84 @@
+import random
+from collections import namedtuple
+
+from automata.constants import ADDRESS_LIMITS
+
+# Parâmetros do gerador de programas sintéticos:
+# rungs: número de linhas; depth: níveis de parênteses aninhados em cada expressão;
+# fan_in: máximo de operandos combinados em cada nível (a | b | c ...);
+# timer_density / counter_density: fração das linhas que acionam bobinas de temporizador / contador;
+# negation_probability: chance de cada operando ou grupo ser negado; seed: semente do gerador
+GeneratorConfig = namedtuple(
+    'GeneratorConfig',
+    ['rungs', 'depth', 'fan_in', 'timer_density', 'counter_density', 'negation_probability', 'seed'],
+    defaults=(100, 3, 2, 0.1, 0.05, 0.3, 0),
+)
+
+
+class _ProgramGenerator:
+    """
+    Gera as expressões respeitando a gramática do autômato (automata.automaton), que é mais
+    restrita que a do compilador:
+    - uma negação que não é o primeiro termo de uma sequência precisa estar entre parênteses: 'x ^ (!y)';
+    - em uma sequência com mais de dois termos, os termos do meio precisam ser grupos: 'a | (b) | c'.
+    """
+
+    def __init__(self, config, operands):
+        self.config = config
+        self.operands = operands
+        self.rng = random.Random(config.seed)
+
+    def _term(self, depth):
+        if depth > 0:
+            return f'({self.sequence(depth - 1)})', True
+        return self.rng.choice(self.operands), False
+
+    def sequence(self, depth):
+        rng = self.rng
+        count = rng.randint(2, max(self.config.fan_in, 2)) if depth > 0 or self.config.fan_in > 1 else 1
+        # Ao menos um termo desce até a profundidade pedida
+        deep = rng.randrange(count)
+        parts = []
+        for position in range(count):
+            if depth > 0 and (position == deep or rng.random() < 0.5):
+                text, is_group = self._term(depth)
+            else:
+                text, is_group = self._term(0)
+            if rng.random() < self.config.negation_probability:
+                text = f'!{text}' if position == 0 else f'(!{text})'
+            elif 0 < position < count - 1 and not is_group:
+                text = f'({text})'
+            if position > 0:
+                parts.append(rng.choice((' ^ ', ' | ')))
+            parts.append(text)
+        return ''.join(parts)
+
+
+def generate_program(config=GeneratorConfig()):
+    """
+    Gera um programa sintático válido (aceito por interpretSentence) com config.rungs linhas.
+    As bobinas de temporizador (TONx/TOFx) e de contador (CUPx/CDNx) são distribuídas pelas linhas
+    conforme as densidades, e seus contatos (TONOx, CUPOx, ...) podem ser lidos pelas expressões.
+    As demais linhas gravam em O1..O8 e B1..B32, em rodízio.
+    """
+    rng = random.Random(config.seed)
+    timer_count = min(round(config.rungs * config.timer_density), ADDRESS_LIMITS['ton'])
+    counter_count = min(round(config.rungs * config.counter_density), ADDRESS_LIMITS['cup'])
+
+    coils = [f"{rng.choice(('TON', 'TOF'))}{index}" for index in range(1, timer_count + 1)]
+    coils += [f"{rng.choice(('CUP', 'CDN'))}{index}" for index in range(1, counter_count + 1)]
+
+    operands = [f'I{index}' for index in range(1, ADDRESS_LIMITS['i'] + 1)]
+    operands += [f'O{index}' for index in range(1, ADDRESS_LIMITS['o'] + 1)]
+    operands += [f'B{index}' for index in range(1, ADDRESS_LIMITS['b'] + 1)]
+    operands += [f'{coil[:3]}O{coil[3:]}' for coil in coils]  # Contatos: TON1 -> TONO1, CUP2 -> CUPO2
+
+    storage = [f'O{index}' for index in range(1, ADDRESS_LIMITS['o'] + 1)]
+    storage += [f'B{index}' for index in range(1, ADDRESS_LIMITS['b'] + 1)]
+    targets = [storage[index % len(storage)] for index in range(max(config.rungs - len(coils), 0))]
+    # As bobinas ficam espalhadas pelo programa, na ordem em que foram criadas
+    for coil in coils:
+        targets.insert(rng.randint(0, len(targets)), coil)
+
+    generator = _ProgramGenerator(config, operands)
+    return [f'{target} = {generator.sequence(config.depth)}' for target in targets[:config.rungs]]
@@ -1,9 +1,47 @@
+import logging
 import re
+import time
+from collections import namedtuple
 from components.counter import Counter
+from components.timebase import ScanTimeBase
 from components.timer import Timer
+from components.timer_scheduler import TimerScheduler
+from .codegen import generate_program
+from .compiler import LineCompileCache, convert_to_rpn
+from .instructions import (
+    BANK_COUNTER,
+    BANK_INPUT,
+    BANK_TIMER,
+    OP_AND,
+    OP_COUNTER_COIL,
+    OP_LOAD,
+    OP_NOT,
+    OP_OR,
+    OP_STORE,
+    OP_TIMER_COIL,
+    analyze_rung,
+    program_references,
+    resolve_program,
+    resolve_rung,
+)
+from .optimizer import OP_CONST, OP_JUMP_IF_FALSE_OR_POP, OP_JUMP_IF_TRUE_OR_POP, optimize_program
+from .statistics import ScanStatistics
+
+logger = logging.getLogger('clp.scan_cycle')
+
+# Formas de execução do programa compilado
+BACKENDS = ('rpn', 'resolved', 'optimized', 'codegen')
+
+# Programa já compilado aguardando a troca online (hot_swap), aplicado entre duas varreduras
+PendingProgram = namedtuple(
+    'PendingProgram',
+    ['user_program', 'compiled_program', 'resolved_program', 'generated_program', 'generated_source'],
+)
 
 class ScanCycle:
-    def __init__(self, logical_structure):
+    BACKENDS = BACKENDS
+
+    def __init__(self, logical_structure, backend='rpn', timer_count=32, timebase=None, change_driven=False):
         self.cycles = 0  # Número de ciclos de varredura executados
         # Inicialização de atributos relacionados às entradas, saídas e memórias do PLC
         self.inputs = [False] * 8  # 8 entradas digitais
@@ -13,24 +51,57 @@ class ScanCycle:
         self.boolean_memories = [False] * 32  # Memórias booleanas locais (B1,B2,...B32)
         self.logical_structure = logical_structure
 
+        # Base de tempo dos temporizadores: por padrão um tick (0.1 s) por varredura.
+        # Use MonotonicTimeBase para seguir o tempo real ou VirtualClock para simulação.
+        self.timebase = timebase if timebase is not None else ScanTimeBase()
+
         # Dicionários de Temporizadores e Contadores
+        # Os temporizadores em contagem ficam no escalonador, ordenados pelo tick de expiração
+        self.timer_scheduler = TimerScheduler()
         self.timers = {
-            f"T{i+1}": Timer(name=f"T{i+1}") for i in range(32)
-        }  # Temporizadores T1, T2, ..., T32
+            f"T{i+1}": Timer(name=f"T{i+1}", scheduler=self.timer_scheduler) for i in range(timer_count)
+        }  # Temporizadores T1, T2, ..., T32 (por padrão)
 
         self.counters = {
             f"C{i+1}": Counter(name=f"C{i+1}", counter_type='UP') for i in range(8)
         }  # Contadores C1, C2, ..., C8
+        # Listas indexadas pelos operandos resolvidos (T1 -> 0, C1 -> 0, ...)
+        self.timer_list = list(self.timers.values())
+        self.counter_list = list(self.counters.values())
+        self.timer_indexes = {timer: index for index, timer in enumerate(self.timer_list)}
 
         self.mode = 'STOP'  # Modo inicial do PLC
+        self.backend = 'rpn'
+        self.compile_cache = LineCompileCache()  # Reaproveita linhas já compiladas entre recompilações
+        self.compiled_program = ()  # Programa do usuário já compilado (tupla de CompiledRung)
+        self.resolved_program = ()  # Instruções com operandos resolvidos (backends 'resolved' e 'optimized')
+        self.generated_program = None  # Função Python gerada (backend 'codegen')
+        self.generated_source = ''
+        self.pending_program = None  # Programa aguardando troca online (ver hot_swap)
+
+        # Execução orientada a mudanças (ver set_change_driven): cada endereço (banco, índice)
+        # guarda a época da sua última mudança e cada linha a época da sua última avaliação
+        self.change_driven = False
+        self.rung_dependencies = ()  # RungDependencies de cada linha do programa
+        self.change_epoch = 0
+        self.address_epochs = {}
+        self.rung_epochs = []
+        self.rungs_skipped = 0  # Linhas não reavaliadas por não terem entradas alteradas
+
+        self.statistics = None  # ScanStatistics, quando a instrumentação está ligada (enable_statistics)
+
         self.user_program = []  # Lista para armazenar o programa do usuário
 
         # Para detecção de bordas em contadores
         self.counter_coils = {}       # Estado atual das bobinas CUPx/CDNx
         self.prev_counter_coils = {}  # Estado anterior das bobinas CUPx/CDNx
 
+        self.set_backend(backend)
+        if change_driven:
+            self.set_change_driven(True)
+
     def initialize_system(self):
-        print("Inicializando o sistema...")
+        logger.info("Inicializando o sistema...")
         self.cycles = 0
         self.memory_image_inputs = [False] * len(self.memory_image_inputs)
         self.memory_image_outputs = [False] * len(self.memory_image_outputs)
@@ -41,36 +112,227 @@ class ScanCycle:
             timer.isActive = False
             timer.triggered = False
             timer.type = 'ON DELAY'  # default, pode ser alterado depois
+        self.timer_scheduler.clear()
         for counter in self.counters.values():
             counter.count = 0
-        print("Sistema inicializado com sucesso.")
+        # Uma troca online pendente é instalada agora: o estado já foi zerado
+        self._apply_pending_program()
+        self.invalidate_dependencies()
+        logger.info("Sistema inicializado com sucesso.")
+
+    @property
+    def user_program(self):
+        return self._user_program
+
+    @user_program.setter
+    def user_program(self, program_lines):
+        """
+        Armazena o programa do usuário e o compila uma única vez.
+        O ciclo de varredura executa apenas a forma compilada (compiled_program).
+        Apenas linhas novas ou alteradas desde a última compilação são processadas.
+        Uma troca online pendente (hot_swap) é descartada: o programa carregado prevalece.
+        """
+        self.pending_program = None
+        self._user_program = list(program_lines)
+        self.compiled_program = self.compile_cache.compile_program(self._user_program)
+        self._compile_backend()
+
+    def load_program(self, program_lines):
+        """
+        Carrega (e compila) um novo programa do usuário.
+        """
+        self.user_program = program_lines
+
+    def set_backend(self, backend):
+        """
+        Seleciona a forma de execução do programa: 'rpn' (tokens em texto), 'resolved'
+        (opcodes com operandos já resolvidos para (banco, índice)), 'optimized' (opcodes resolvidos
+        após dobra de constantes e eliminação de subexpressões comuns, ver optimizer.py) ou
+        'codegen' (uma função Python gerada e compilada para o programa inteiro).
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend inválido: {backend}. Backends válidos: {', '.join(self.BACKENDS)}.")
+        if self.change_driven and backend != 'resolved':
+            raise ValueError("A execução orientada a mudanças requer o backend 'resolved'.")
+        if self.statistics is not None and self.statistics.rung_profiling:
+            self._check_rung_profiling(backend, self.change_driven)
+        self.backend = backend
+        self._compile_backend()
+        if self.pending_program is not None:
+            # A troca online pendente foi gerada para o backend anterior
+            self.pending_program = self._build_pending_program(
+                self.pending_program.user_program, self.pending_program.compiled_program
+            )
+
+    def _build_backend(self, compiled_program):
+        """
+        Gera a forma executável de um programa compilado para o backend selecionado.
+        Retorna (resolved_program, generated_program, generated_source).
+        """
+        if self.backend == 'resolved':
+            return resolve_program(compiled_program), None, ''
+        if self.backend == 'optimized':
+            return optimize_program(compiled_program)[0], None, ''
+        if self.backend == 'codegen':
+            generated_program, generated_source = generate_program(compiled_program)
+            return (), generated_program, generated_source
+        return (), None, ''
+
+    def _compile_backend(self):
+        """
+        Gera a forma executável do programa atual para o backend selecionado.
+        """
+        self.resolved_program, self.generated_program, self.generated_source = self._build_backend(
+            self.compiled_program
+        )
+        self._refresh_dependencies()
+        if self.statistics is not None:
+            self.statistics.reset_rungs()
+
+    @property
+    def optimization_report(self):
+        """
+        OptimizationReport do programa atual: instruções por varredura antes e depois da otimização.
+        """
+        return optimize_program(self.compiled_program)[1]
+
+    def set_change_driven(self, enabled):
+        """
+        Liga ou desliga a execução orientada a mudanças (apenas no backend 'resolved').
+        Cada linha só é reavaliada quando algum endereço que ela lê (entrada, saída, memória B,
+        contato de temporizador ou de contador) ou grava mudou desde a sua última avaliação. A ordem das
+        linhas é mantida, então o resultado é o mesmo da execução completa: uma linha com as
+        mesmas leituras grava os mesmos valores, e as bobinas de temporizador e de contador
+        reaplicadas com o mesmo valor não alteram o estado. Uma bobina de temporizador que altera
+        qualquer estado do temporizador (contagem iniciada ou zerada, contato) marca o endereço,
+        então as demais linhas que acionam a mesma bobina também são reavaliadas.
+        """
+        if enabled and self.backend != 'resolved':
+            raise ValueError("A execução orientada a mudanças requer o backend 'resolved'.")
+        if self.statistics is not None and self.statistics.rung_profiling:
+            self._check_rung_profiling(self.backend, enabled)
+        self.change_driven = bool(enabled)
+        self._refresh_dependencies()
+
+    def _refresh_dependencies(self):
+        if self.change_driven:
+            self.rung_dependencies = tuple(analyze_rung(rung) for rung in self.compiled_program)
+        else:
+            self.rung_dependencies = ()
+        self.invalidate_dependencies()
+
+    def invalidate_dependencies(self):
+        """
+        Força a reavaliação de todas as linhas na próxima varredura. Deve ser chamado quando a
+        imagem de processo, os temporizadores ou os contadores são alterados fora da varredura.
+        """
+        self.rung_epochs = [-1] * len(self.rung_dependencies)
+
+    def _mark_changed(self, address):
+        self.change_epoch += 1
+        self.address_epochs[address] = self.change_epoch
+
+    def hot_swap(self, program_lines):
+        """
+        Edição online: compila o novo programa agora e o troca atomicamente no início da próxima
+        varredura, sem parar o ciclo. A imagem de processo, as memórias B e o estado dos
+        temporizadores e contadores que continuam no programa são preservados.
+        Fora do modo RUN a troca é imediata, e uma troca pendente é feita ao sair de RUN.
+        """
+        program_lines = list(program_lines)
+        compiled_program = self.compile_cache.compile_program(program_lines)
+        self.pending_program = self._build_pending_program(program_lines, compiled_program)
+        if self.mode != 'RUN':
+            self._apply_pending_program()
+
+    def _build_pending_program(self, program_lines, compiled_program):
+        return PendingProgram(program_lines, compiled_program, *self._build_backend(compiled_program))
+
+    def _apply_pending_program(self):
+        pending = self.pending_program
+        self.pending_program = None
+        if pending is None:
+            return
+        self._user_program = pending.user_program
+        self.compiled_program = pending.compiled_program
+        self.resolved_program = pending.resolved_program
+        self.generated_program = pending.generated_program
+        self.generated_source = pending.generated_source
+        self._release_unused_state()
+        self._refresh_dependencies()
+        if self.statistics is not None:
+            self.statistics.reset_rungs()
+
+    def _release_unused_state(self):
+        """
+        Zera temporizadores, contadores e bobinas de contador que não existem mais no programa.
+        """
+        timers_used, counters_used, coils_used = program_references(self.compiled_program)
+        for index, timer in enumerate(self.timer_list):
+            if index not in timers_used and (timer.isActive or timer.triggered):
+                timer.isActive = False
+                timer.triggered = False
+                timer.remaining_time = 0
+        for index, counter in enumerate(self.counter_list):
+            if index not in counters_used:
+                counter.count = 0
+        self.counter_coils = {name: state for name, state in self.counter_coils.items() if name in coils_used}
+        self.prev_counter_coils = {
+            name: state for name, state in self.prev_counter_coils.items() if name in coils_used
+        }
+
+    def set_input(self, index, value):
+        """
+        Altera o estado de uma entrada física/simulada (índice 0 = I1).
+        """
+        self.inputs[index] = value
+
+    def led_byte(self):
+        """
+        Retorna as saídas como um byte (bit 0 = O1), no formato enviado ao Arduino.
+        """
+        value = 0
+        for i, state in enumerate(self.outputs):
+            if state:
+                value |= 1 << i
+        return value
 
     def read_inputs(self):
         """
         Lê o estado das entradas e armazena na memória imagem.
         """
         if self.mode == 'RUN':
+            previous = self.memory_image_inputs
             self.memory_image_inputs = self.inputs.copy()
+            if self.change_driven:
+                for index, value in enumerate(self.memory_image_inputs):
+                    if value != previous[index]:
+                        self._mark_changed((BANK_INPUT, index))
 
     def process_user_program(self):
         """
-        Processa o programa do usuário e aplica a lógica às saídas usando RPN.
+        Processa o programa do usuário (já compilado) e aplica a lógica às saídas usando RPN.
         """
         if self.mode == 'RUN':
-            for line in self.user_program:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue  # Pule linhas vazias ou comentários
-                if '=' not in line:
-                    print(f"Linha inválida: {line}")
-                    continue
-                identifier, expression = line.split('=', 1)
-                identifier = identifier.strip()
-                expression = expression.strip()
-                rpn_instructions = self._convert_to_rpn(expression)
-                # Adiciona o identificador para definir a saída ou memória no final
-                rpn_instructions.append(identifier)
-                self._execute_rpn(rpn_instructions)
+            if self.backend == 'codegen':
+                self.generated_program(
+                    self.memory_image_inputs,
+                    self.memory_image_outputs,
+                    self.boolean_memories,
+                    self.timer_list,
+                    self.counter_list,
+                    self.counter_coils,
+                    self._apply_timer_coil,
+                )
+            elif self.change_driven:
+                self._execute_change_driven()
+            elif self.backend == 'optimized':
+                self._execute_optimized(self.resolved_program)
+            elif self.backend == 'resolved':
+                self._execute_resolved(self.resolved_program)
+            else:
+                for rung in self.compiled_program:
+                    self._execute_rpn(rung.instructions)
 
     def update_outputs(self):
         """
@@ -81,10 +343,15 @@ class ScanCycle:
 
     def update_timers(self):
         """
-        Atualiza o estado de todos os temporizadores.
+        Avança os temporizadores pelos ticks decorridos na base de tempo. Apenas os temporizadores que
+        expiram são tocados, independentemente da quantidade de temporizadores existentes.
         """
-        for timer in self.timers.values():
-            timer.update()
+        ticks = self.timebase.elapsed_ticks()
+        if ticks:
+            expired = self.timer_scheduler.advance(ticks)
+            if self.change_driven:
+                for timer in expired:
+                    self._mark_changed((BANK_TIMER, self.timer_indexes[timer]))
 
     def increment_counter(self, counter_name):
         """
@@ -109,11 +376,40 @@ class ScanCycle:
             timer.start(delay)
             timer.type = timer_type
 
+    def enable_statistics(self, budget=None, history=1000, rung_profiling=False):
+        """
+        Liga a instrumentação das varreduras e retorna o ScanStatistics com os resultados.
+        budget é o tempo máximo de uma varredura em segundos (watchdog). Com rung_profiling,
+        as linhas são executadas e cronometradas uma a uma, o que mede o custo relativo de cada
+        linha mas deixa a varredura mais lenta. Só os backends interpretados ('rpn' e 'resolved',
+        sem execução orientada a mudanças) executam linha a linha: nos demais o custo medido
+        seria o de outro executor, e o perfil é recusado.
+        """
+        if rung_profiling:
+            self._check_rung_profiling(self.backend, self.change_driven)
+        self.statistics = ScanStatistics(budget=budget, history=history, rung_profiling=rung_profiling)
+        return self.statistics
+
+    @staticmethod
+    def _check_rung_profiling(backend, change_driven):
+        if backend not in ('rpn', 'resolved'):
+            raise ValueError(f"O custo por linha não está disponível no backend '{backend}'.")
+        if change_driven:
+            raise ValueError("O custo por linha não está disponível na execução orientada a mudanças.")
+
+    def disable_statistics(self):
+        self.statistics = None
+
     def scan(self):
         """
         Executa um ciclo completo de varredura do PLC.
         """
         if self.mode == 'RUN':
+            if self.statistics is not None:
+                self._scan_instrumented(self.statistics)
+                return
+            if self.pending_program is not None:
+                self._apply_pending_program()  # Troca online entre duas varreduras
             self.read_inputs()
             self.update_timers()  # Atualiza temporizadores
             self.process_user_program()
@@ -124,15 +420,62 @@ class ScanCycle:
             # Atualiza estado anterior dos contadores
             self.prev_counter_coils = self.counter_coils.copy()
 
+    def _scan_instrumented(self, statistics):
+        """
+        Mesma sequência de scan(), cronometrando cada fase.
+        """
+        clock = time.perf_counter_ns
+        start = clock()
+        if self.pending_program is not None:
+            self._apply_pending_program()
+        self.read_inputs()
+        inputs_done = clock()
+        self.update_timers()
+        timers_done = clock()
+        if statistics.rung_profiling:
+            self._process_user_program_profiled(statistics)
+        else:
+            self.process_user_program()
+        program_done = clock()
+        self._process_counters_coils()
+        counters_done = clock()
+        self.update_outputs()
+        self.cycles += 1
+        self.prev_counter_coils = self.counter_coils.copy()
+        end = clock()
+        statistics.record_scan(
+            (inputs_done - start, timers_done - inputs_done, program_done - timers_done,
+             counters_done - program_done, end - counters_done),
+            end - start,
+        )
+
+    def _process_user_program_profiled(self, statistics):
+        clock = time.perf_counter_ns
+        for position, rung in enumerate(self.compiled_program):
+            start = clock()
+            if self.backend == 'rpn':
+                self._execute_rpn(rung.instructions)
+            else:
+                self._execute_resolved(resolve_rung(rung))
+            statistics.record_rung(position, clock() - start)
+
     def set_mode(self, mode):
         """
         Altera o modo de operação do PLC (RUN, STOP, PROGRAM).
         """
         if mode in ['RUN', 'STOP', 'PROGRAM']:
+            if mode != 'RUN' and self.mode == 'RUN':
+                # Sem próxima varredura, a troca online pendente é feita ao sair de RUN
+                self._apply_pending_program()
+            if mode == 'RUN' and self.mode != 'RUN':
+                # O tempo em que o CLP ficou parado não conta para os temporizadores
+                self.timebase.reset()
+                # O estado pode ter sido editado fora de RUN: reavalia todas as linhas
+                self.invalidate_dependencies()
             self.mode = mode
-            print(f"Modo alterado para: {self.mode}")
+            logger.info("Modo alterado para: %s", self.mode)
         else:
-            print("Modo inválido. Modos válidos: RUN, STOP, PROGRAM.")
+            logger.warning("Modo inválido: %s. Modos válidos: RUN, STOP, PROGRAM.", mode)
 
     def _process_counters_coils(self):
         """
@@ -149,10 +492,14 @@ class ScanCycle:
                     coil_num = match.group(2)
                     counter_name = f"C{coil_num}"
                     if counter_name in self.counters:
+                        counter = self.counters[counter_name]
+                        was_set = counter.count > 0
                         if coil_type == 'CUP':
-                            self.counters[counter_name].increment()
+                            counter.increment()
                         elif coil_type == 'CDN':
-                            self.counters[counter_name].decrement()
+                            counter.decrement()
+                        if self.change_driven and (counter.count > 0) != was_set:
+                            self._mark_changed((BANK_COUNTER, int(coil_num) - 1))
 
     def _get_value(self, token):
         """
@@ -229,34 +576,7 @@ class ScanCycle:
         """
         Converte uma expressão lógica em RPN usando um algoritmo tipo Shunting Yard simplificado.
         """
-        expression = expression.replace(' ', '')
-        token_pattern = r'(\bNOT\b|\(|\)|\^|\||\b[A-Za-z][A-Za-z0-9]*\b)'
-        tokens = re.findall(token_pattern, expression)
-        output_queue = []
-        operator_stack = []
-        precedence = {'NOT': 3, '^': 2, '|': 1}
-        associativity = {'NOT': 'right', '^': 'left', '|': 'left'}
-
-        for token in tokens:
-            token_upper = token.upper()
-            if token_upper in precedence:
-                while (operator_stack and operator_stack[-1] != '(' and
-                       ((associativity[token_upper] == 'left' and precedence[token_upper] <= precedence[operator_stack[-1]]) or
-                        (associativity[token_upper] == 'right' and precedence[token_upper] < precedence[operator_stack[-1]]))):
-                    output_queue.append(operator_stack.pop())
-                operator_stack.append(token_upper)
-            elif token == '(':
-                operator_stack.append(token)
-            elif token == ')':
-                while operator_stack and operator_stack[-1] != '(':
-                    output_queue.append(operator_stack.pop())
-                operator_stack.pop()  # Remove '('
-            else:
-                output_queue.append(token_upper)
-        while operator_stack:
-            output_queue.append(operator_stack.pop())
-
-        return output_queue
+        return convert_to_rpn(expression)
 
     def _execute_rpn(self, rpn_instructions):
         """
@@ -264,7 +584,8 @@ class ScanCycle:
         Diferencia bobinas e contatos de timers, e registra bobinas de contadores.
         """
         stack = []
-        for token in rpn_instructions:
+        last_index = len(rpn_instructions) - 1
+        for position, token in enumerate(rpn_instructions):
             token_upper = token.upper()
 
             coil_pattern_timer = r'^(TON|TOF)(\d+)$'
@@ -316,7 +637,7 @@ class ScanCycle:
                 # É uma saída ou memória booleana
                 # Se for o último token (identificador), é destino de atribuição
                 # Caso contrário, é um operando, apenas empilhar seu valor
-                if token == rpn_instructions[-1]:
+                if position == last_index:
                     # Identificador final: atribui o valor
                     value = stack.pop()
                     self._set_output(token_upper, value)
@@ -330,11 +651,158 @@ class ScanCycle:
                 value = self._get_value(token_upper)
                 stack.append(value)
 
+    def _execute_resolved(self, code):
+        """
+        Executa instruções com operandos resolvidos (ver scan_cycle.instructions).
+        Não há trabalho com texto ou expressões regulares durante a execução.
+        """
+        # Os bancos são obtidos a cada varredura pois read_inputs substitui a lista de entradas
+        banks = (self.memory_image_inputs, self.memory_image_outputs, self.boolean_memories)
+        timer_list = self.timer_list
+        counter_list = self.counter_list
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for opcode, arg1, arg2 in code:
+            if opcode == OP_LOAD:
+                if arg1 == BANK_TIMER:
+                    push(timer_list[arg2].triggered)
+                elif arg1 == BANK_COUNTER:
+                    push(counter_list[arg2].count > 0)
+                else:
+                    push(banks[arg1][arg2])
+            elif opcode == OP_AND:
+                operand2 = pop()
+                push(pop() and operand2)
+            elif opcode == OP_OR:
+                operand2 = pop()
+                push(pop() or operand2)
+            elif opcode == OP_NOT:
+                push(not pop())
+            elif opcode == OP_STORE:
+                banks[arg1][arg2] = pop()
+            elif opcode == OP_TIMER_COIL:
+                self._apply_timer_coil(timer_list[arg1], arg2, pop())
+            elif opcode == OP_COUNTER_COIL:
+                self.counter_coils[arg1] = pop()
+
+    def _execute_optimized(self, code):
+        """
+        Executa as instruções do backend 'optimized' (ver scan_cycle.optimizer): além das instruções
+        resolvidas há constantes, subexpressões comuns (BANK_TEMP) e saltos em curto-circuito.
+        """
+        # O último banco guarda as subexpressões comuns calculadas no início da varredura (BANK_TEMP)
+        banks = (self.memory_image_inputs, self.memory_image_outputs, self.boolean_memories, None, None, {})
+        timer_list = self.timer_list
+        counter_list = self.counter_list
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        position = 0
+        end = len(code)
+        while position < end:
+            opcode, arg1, arg2 = code[position]
+            position += 1
+            if opcode == OP_LOAD:
+                if arg1 == BANK_TIMER:
+                    push(timer_list[arg2].triggered)
+                elif arg1 == BANK_COUNTER:
+                    push(counter_list[arg2].count > 0)
+                else:
+                    push(banks[arg1][arg2])
+            elif opcode == OP_JUMP_IF_FALSE_OR_POP:
+                if stack[-1]:
+                    pop()
+                else:
+                    position = arg1
+            elif opcode == OP_JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    position = arg1
+                else:
+                    pop()
+            elif opcode == OP_NOT:
+                push(not pop())
+            elif opcode == OP_CONST:
+                push(arg1)
+            elif opcode == OP_STORE:
+                banks[arg1][arg2] = pop()
+            elif opcode == OP_TIMER_COIL:
+                self._apply_timer_coil(timer_list[arg1], arg2, pop())
+            elif opcode == OP_COUNTER_COIL:
+                self.counter_coils[arg1] = pop()
+
+    def _execute_change_driven(self):
+        """
+        Executa, em ordem, apenas as linhas cujas leituras mudaram desde a última avaliação.
+        As gravações que alteram algum valor marcam o endereço como modificado, o que faz as
+        linhas seguintes (nesta varredura) e as anteriores (na próxima) que o leem serem reavaliadas.
+        """
+        banks = (self.memory_image_inputs, self.memory_image_outputs, self.boolean_memories)
+        timer_list = self.timer_list
+        counter_list = self.counter_list
+        address_epochs = self.address_epochs
+        rung_epochs = self.rung_epochs
+        for position, rung in enumerate(self.rung_dependencies):
+            evaluated_at = rung_epochs[position]
+            if evaluated_at >= 0:
+                for address in rung.watched:
+                    if address_epochs.get(address, 0) > evaluated_at:
+                        break
+                else:
+                    self.rungs_skipped += 1
+                    continue
+            rung_epochs[position] = self.change_epoch
+
+            stack = []
+            push = stack.append
+            pop = stack.pop
+            for opcode, arg1, arg2 in rung.expression:
+                if opcode == OP_LOAD:
+                    if arg1 == BANK_TIMER:
+                        push(timer_list[arg2].triggered)
+                    elif arg1 == BANK_COUNTER:
+                        push(counter_list[arg2].count > 0)
+                    else:
+                        push(banks[arg1][arg2])
+                elif opcode == OP_AND:
+                    operand2 = pop()
+                    push(pop() and operand2)
+                elif opcode == OP_OR:
+                    operand2 = pop()
+                    push(pop() or operand2)
+                elif opcode == OP_NOT:
+                    push(not pop())
+
+            value = pop()
+            opcode, arg1, arg2 = rung.target
+            if opcode == OP_STORE:
+                bank = banks[arg1]
+                if bank[arg2] != value:
+                    bank[arg2] = value
+                    self._mark_changed((arg1, arg2))
+            elif opcode == OP_TIMER_COIL:
+                # Qualquer mudança de estado conta, não só do contato: outra linha que aciona a
+                # mesma bobina (ex: TON1 = I1 e TON1 = I2) depende de a contagem ter partido ou sido zerada
+                timer = timer_list[arg1]
+                previous = (timer.isActive, timer.triggered, timer.remaining_time)
+                self._apply_timer_coil(timer, arg2, value)
+                if (timer.isActive, timer.triggered, timer.remaining_time) != previous:
+                    self._mark_changed((BANK_TIMER, arg1))
+            elif opcode == OP_COUNTER_COIL:
+                if self.counter_coils.get(arg1) != value:
+                    self.counter_coils[arg1] = value
+                    self._mark_changed((BANK_COUNTER, arg2))
+
     def _set_timer(self, timer_name, timer_type, coil_value):
         timer = self.timers.get(timer_name)
         if not timer:
             raise ValueError(f"Temporizador desconhecido: {timer_name}")
+        self._apply_timer_coil(timer, timer_type, coil_value)
 
+    def _apply_timer_coil(self, timer, timer_type, coil_value):
+        """
+        Aplica o estado da bobina (TON ou TOF) ao temporizador.
+        """
         if timer_type == "TON":
             timer.type = 'ON DELAY'
             # ON DELAY:
@@ -0,0 +1,139 @@
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger('clp.scan_cycle')
+
+# Cópia imutável da imagem de processo publicada após cada período da thread de varredura.
+# timers e counters trazem o tempo restante / a contagem de T1.. e C1.., na ordem dos índices.
+# status é o resumo de ScanStatistics.format_status (None sem instrumentação).
+ProcessSnapshot = namedtuple(
+    'ProcessSnapshot',
+    ['cycles', 'mode', 'inputs', 'outputs', 'boolean_memories', 'timers', 'counters', 'status', 'overruns'],
+)
+
+
+def take_snapshot(scan_cycle):
+    statistics = scan_cycle.statistics
+    return ProcessSnapshot(
+        cycles=scan_cycle.cycles,
+        mode=scan_cycle.mode,
+        inputs=tuple(scan_cycle.inputs),
+        outputs=tuple(scan_cycle.outputs),
+        boolean_memories=tuple(scan_cycle.boolean_memories),
+        timers=tuple(timer.remaining_time for timer in scan_cycle.timer_list),
+        counters=tuple(counter.count for counter in scan_cycle.counter_list),
+        status=statistics.format_status() if statistics is not None else None,
+        overruns=statistics.overruns if statistics is not None else 0,
+    )
+
+
+class ScanThread(threading.Thread):
+    """
+    Executa o ciclo de varredura em uma thread própria, uma varredura a cada 'period' segundos.
+    Somente esta thread acessa o ScanCycle: as outras threads (ex: a interface) enfileiram
+    alterações com set_input/submit, aplicadas entre duas varreduras, e leem o estado pelo
+    último ProcessSnapshot publicado em 'snapshot'.
+    Com um transporte de E/S conectado (attach_io, ex: communication.SerialTransport), as saídas
+    são trocadas pelas entradas do hardware uma vez por período, sem bloquear a varredura: a
+    leitura mais recente do transporte é aplicada antes da varredura seguinte.
+    """
+
+    def __init__(self, scan_cycle, period=0.1):
+        super().__init__(name='scan-cycle', daemon=True)
+        self.scan_cycle = scan_cycle
+        self.period = period
+        self.late_periods = 0  # Períodos em que a varredura terminou depois do prazo
+        self._commands = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+        self.io = None
+        self._applied_reading = None  # Última leitura do hardware já aplicada às entradas
+        self.snapshot = take_snapshot(scan_cycle)
+
+    def set_input(self, index, value):
+        """
+        Enfileira a mudança de uma entrada (índice 0 = I1); vale a partir da próxima varredura.
+        """
+        self._commands.put((self.scan_cycle.set_input, (index, value)))
+
+    def submit(self, function, *args):
+        """
+        Enfileira uma chamada function(*args) a ser executada na thread de varredura,
+        entre duas varreduras (ex: submit(scan_cycle.hot_swap, linhas)).
+        """
+        self._commands.put((function, args))
+
+    def attach_io(self, io):
+        """
+        Enfileira a conexão (ou, com None, a desconexão) de um transporte de E/S, que precisa
+        oferecer 'latest' (InputReading mais recente ou None) e exchange(led_byte).
+        """
+        self.submit(self._set_io, io)
+
+    def _set_io(self, io):
+        self.io = io
+        self._applied_reading = None
+
+    def _apply_hardware_inputs(self, reading):
+        # Só as entradas que mudaram no hardware são aplicadas: um clique na interface em uma
+        # entrada cujo botão físico não mudou continua valendo
+        previous = self._applied_reading.inputs if self._applied_reading is not None else None
+        for index, value in enumerate(reading.inputs):
+            if previous is None or value != previous[index]:
+                self.scan_cycle.set_input(index, value)
+        self._applied_reading = reading
+
+    def _drain_commands(self):
+        while True:
+            try:
+                function, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                function(*args)
+            except Exception:
+                logger.exception("Erro ao aplicar comando na thread de varredura")
+
+    def run_once(self):
+        """
+        Um período da thread: aplica os comandos pendentes e as entradas do hardware, varre (em RUN),
+        envia as saídas ao hardware e publica o snapshot.
+        """
+        self._drain_commands()
+        io = self.io
+        if io is not None:
+            reading = io.latest
+            if reading is not None and reading is not self._applied_reading:
+                self._apply_hardware_inputs(reading)
+        if self.scan_cycle.mode == 'RUN':
+            try:
+                self.scan_cycle.scan()
+            except Exception:
+                # Falha na execução do programa: o CLP vai para STOP, como um controlador real
+                logger.exception("Erro na varredura; o CLP foi colocado em STOP")
+                self.scan_cycle.set_mode('STOP')
+        if io is not None:
+            io.exchange(self.scan_cycle.led_byte())  # A resposta chega durante os próximos períodos
+        self.snapshot = take_snapshot(self.scan_cycle)
+
+    def run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            self.run_once()
+            deadline += self.period
+            now = time.monotonic()
+            if now > deadline:
+                # Período estourado: retoma a partir de agora em vez de varrer em rajada
+                self.late_periods += 1
+                deadline = now
+            self._stop_event.wait(deadline - now)
+
+    def stop(self, timeout=None):
+        """
+        Encerra a thread após o período em andamento.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
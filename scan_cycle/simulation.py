@@ -0,0 +1,93 @@
+from collections import namedtuple
+
+from components.timebase import VirtualClock
+
+# Mudança de uma entrada em um tick de simulação (índice 0 = I1)
+InputEvent = namedtuple('InputEvent', ['tick', 'index', 'value'])
+# Estado das saídas O1..O8 a partir de um tick de simulação
+TraceEntry = namedtuple('TraceEntry', ['tick', 'outputs'])
+
+
+def _snapshot(scan_cycle):
+    """
+    Estado completo que determina o resultado da próxima varredura (exceto o tempo).
+    Se uma varredura não altera este estado, as seguintes também não alteram até que
+    uma entrada mude ou um temporizador expire.
+    """
+    return (
+        tuple(scan_cycle.memory_image_inputs),
+        tuple(scan_cycle.memory_image_outputs),
+        tuple(scan_cycle.boolean_memories),
+        tuple(scan_cycle.outputs),
+        tuple(sorted(scan_cycle.counter_coils.items())),
+        tuple(sorted(scan_cycle.prev_counter_coils.items())),
+        tuple(counter.count for counter in scan_cycle.counter_list),
+        tuple((timer.isActive, timer.triggered, timer.generation) for timer in scan_cycle.timer_list),
+    )
+
+
+class Simulation:
+    """
+    Simula o CLP em tempo virtual com uma varredura por tick (0.1 s).
+    Com fast_forward, quando uma varredura não altera o estado do CLP a simulação salta
+    direto para a próxima mudança de entrada ou expiração de temporizador, pulando as
+    varreduras ociosas. O traço de saídas é o mesmo da execução tick a tick.
+    """
+
+    def __init__(self, scan_cycle):
+        if not isinstance(scan_cycle.timebase, VirtualClock):
+            raise ValueError("A simulação requer um ScanCycle com timebase=VirtualClock().")
+        self.scan_cycle = scan_cycle
+        self.clock = scan_cycle.timebase
+        self.scans = 0  # Varreduras efetivamente executadas na última simulação
+
+    def _ticks_to_next_expiry(self):
+        scheduler = self.scan_cycle.timer_scheduler
+        expiry = scheduler.next_expiry()
+        if expiry is None:
+            return None
+        return max(expiry - scheduler.now, 1)
+
+    def run(self, until_tick, input_events=(), fast_forward=True):
+        """
+        Executa a simulação do tick 0 até until_tick (inclusive) aplicando os eventos de entrada.
+        Retorna a lista de TraceEntry com cada mudança das saídas.
+        """
+        scan_cycle = self.scan_cycle
+        if scan_cycle.mode != 'RUN':
+            scan_cycle.set_mode('RUN')
+        events = sorted(input_events, key=lambda event: event.tick)
+        next_event = 0
+        trace = []
+        self.scans = 0
+        tick = 0
+
+        while tick <= until_tick:
+            while next_event < len(events) and events[next_event].tick <= tick:
+                event = events[next_event]
+                scan_cycle.set_input(event.index, event.value)
+                next_event += 1
+
+            before = _snapshot(scan_cycle) if fast_forward else None
+            scan_cycle.scan()
+            self.scans += 1
+
+            outputs = tuple(scan_cycle.outputs)
+            if not trace or trace[-1].outputs != outputs:
+                trace.append(TraceEntry(tick, outputs))
+
+            step = 1
+            if fast_forward and _snapshot(scan_cycle) == before:
+                # Estado estável: nada muda até a próxima entrada ou expiração
+                candidates = [until_tick + 1 - tick]
+                if next_event < len(events):
+                    candidates.append(events[next_event].tick - tick)
+                expiry = self._ticks_to_next_expiry()
+                if expiry is not None:
+                    candidates.append(expiry)
+                step = max(min(candidates), 1)
+
+            self.clock.advance(step)
+            tick += step
+
+        return trace
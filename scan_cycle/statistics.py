@@ -0,0 +1,120 @@
+from collections import deque
+
+# Fases de uma varredura, na ordem em que ScanCycle.scan as executa
+PHASES = ('read_inputs', 'update_timers', 'process_user_program', 'process_counters', 'update_outputs')
+
+
+class ScanStatistics:
+    """
+    Estatísticas de tempo das varreduras (ver ScanCycle.enable_statistics): duração de cada fase,
+    tempo mínimo, máximo, médio e percentis da varredura, estouros do tempo máximo configurado
+    (watchdog) e, opcionalmente, o custo de cada linha do programa. Os tempos são guardados em
+    nanossegundos e os percentis consideram apenas as últimas 'history' varreduras.
+    """
+
+    def __init__(self, budget=None, history=1000, rung_profiling=False):
+        self.budget = budget  # Tempo máximo de varredura em segundos (None desliga o watchdog)
+        self.rung_profiling = rung_profiling
+        self.history = deque(maxlen=history)
+        self.reset()
+
+    def reset(self):
+        self.scans = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.phase_total_ns = [0] * len(PHASES)
+        self.phase_max_ns = [0] * len(PHASES)
+        self.overruns = 0
+        self.last_overrun_scan = None
+        self.history.clear()
+        self.reset_rungs()
+
+    def reset_rungs(self):
+        """
+        Descarta o custo acumulado das linhas. Deve ser chamado quando o programa muda, pois as
+        linhas são identificadas pela posição no programa.
+        """
+        self.rung_total_ns = {}  # Posição da linha no programa -> tempo acumulado
+        self.rung_first_scan = self.scans  # Varreduras anteriores não entram na média por linha
+
+    def record_scan(self, phase_ns, total_ns):
+        """
+        Registra uma varredura: a duração de cada fase (na ordem de PHASES) e a duração total.
+        """
+        self.scans += 1
+        self.total_ns += total_ns
+        if self.min_ns is None or total_ns < self.min_ns:
+            self.min_ns = total_ns
+        if total_ns > self.max_ns:
+            self.max_ns = total_ns
+        for index, duration in enumerate(phase_ns):
+            self.phase_total_ns[index] += duration
+            if duration > self.phase_max_ns[index]:
+                self.phase_max_ns[index] = duration
+        self.history.append(total_ns)
+        if self.budget is not None and total_ns > self.budget * 1e9:
+            self.overruns += 1
+            self.last_overrun_scan = self.scans
+
+    def record_rung(self, position, duration_ns):
+        self.rung_total_ns[position] = self.rung_total_ns.get(position, 0) + duration_ns
+
+    @property
+    def average_ns(self):
+        return self.total_ns / self.scans if self.scans else 0
+
+    def percentile(self, fraction):
+        """
+        Tempo de varredura (ns) no percentil indicado (ex: 0.99), entre as varreduras recentes.
+        """
+        if not self.history:
+            return 0
+        ordered = sorted(self.history)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def rung_costs(self, compiled_program=None):
+        """
+        Custo médio por varredura de cada linha (ns), da mais cara para a mais barata.
+        Com compiled_program, cada item traz o identificador de destino da linha.
+        """
+        costs = []
+        scans = self.scans - self.rung_first_scan
+        for position, total in self.rung_total_ns.items():
+            name = compiled_program[position].identifier if compiled_program else position
+            costs.append((name, total / scans if scans else 0))
+        return sorted(costs, key=lambda cost: cost[1], reverse=True)
+
+    def summary(self):
+        """
+        Retorna as estatísticas em um dicionário (tempos em microssegundos).
+        """
+        return {
+            'scans': self.scans,
+            'min_us': (self.min_ns or 0) / 1000,
+            'max_us': self.max_ns / 1000,
+            'avg_us': self.average_ns / 1000,
+            'p50_us': self.percentile(0.50) / 1000,
+            'p99_us': self.percentile(0.99) / 1000,
+            'budget_ms': self.budget * 1000 if self.budget is not None else None,
+            'overruns': self.overruns,
+            'phases': {
+                phase: {
+                    'avg_us': (self.phase_total_ns[index] / self.scans / 1000) if self.scans else 0,
+                    'max_us': self.phase_max_ns[index] / 1000,
+                }
+                for index, phase in enumerate(PHASES)
+            },
+        }
+
+    def format_status(self):
+        """
+        Resumo em uma linha para a barra de status da interface.
+        """
+        if not self.scans:
+            return "Varredura: -"
+        text = (f"Varredura: média {self.average_ns / 1000:.0f} us, máx {self.max_ns / 1000:.0f} us, "
+                f"p99 {self.percentile(0.99) / 1000:.0f} us")
+        if self.budget is not None:
+            text += f", estouros {self.overruns}"
+        return text
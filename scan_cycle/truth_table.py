@@ -0,0 +1,135 @@
+from collections import namedtuple
+
+from .instructions import (
+    BANK_BOOLEAN,
+    BANK_INPUT,
+    BANK_OUTPUT,
+    OP_AND,
+    OP_COUNTER_COIL,
+    OP_LOAD,
+    OP_NOT,
+    OP_OR,
+    OP_TIMER_COIL,
+    resolve_rung,
+)
+
+IO_COUNT = 8
+BOOLEAN_COUNT = 32
+
+# variables: nomes das variáveis enumeradas (bit k da combinação = variables[k])
+# outputs/boolean_memories: para cada combinação, a máscara de O1..O8 / B1..B32 após uma varredura
+TruthTable = namedtuple('TruthTable', ['variables', 'outputs', 'boolean_memories'])
+
+
+def _lane_patterns(variable_count, word_size):
+    """
+    Para cada variável cujo bit varia dentro de uma palavra, a máscara dos lanes em que ela vale 1
+    (ex: 0b1010... para a primeira variável). Como word_size é potência de 2, as demais variáveis
+    são constantes dentro de cada palavra.
+    """
+    patterns = []
+    for bit in range(variable_count):
+        if 1 << bit >= word_size:
+            break
+        pattern = 0
+        for lane in range(word_size):
+            if lane >> bit & 1:
+                pattern |= 1 << lane
+        patterns.append(pattern)
+    return patterns
+
+
+def _evaluate_word(code, inputs, outputs, booleans, full):
+    """
+    Avalia o programa para todos os lanes de uma palavra ao mesmo tempo.
+    Cada sinal é um inteiro em que o bit 'lane' é o valor do sinal naquela combinação.
+    """
+    banks = (inputs, outputs, booleans)
+    stack = []
+    for opcode, arg1, arg2 in code:
+        if opcode == OP_LOAD:
+            stack.append(banks[arg1][arg2])
+        elif opcode == OP_NOT:
+            stack.append(stack.pop() ^ full)
+        elif opcode == OP_AND:
+            operand2 = stack.pop()
+            stack.append(stack.pop() & operand2)
+        elif opcode == OP_OR:
+            operand2 = stack.pop()
+            stack.append(stack.pop() | operand2)
+        else:
+            banks[arg1][arg2] = stack.pop()
+
+
+def _combinational_code(compiled_program):
+    code = []
+    for rung in compiled_program:
+        for instruction in resolve_rung(rung):
+            opcode, arg1, _ = instruction
+            if opcode == OP_LOAD and arg1 not in (BANK_INPUT, BANK_OUTPUT, BANK_BOOLEAN):
+                raise ValueError(f"A linha '{rung.identifier}' lê temporizadores/contadores e não é combinacional.")
+            if opcode in (OP_TIMER_COIL, OP_COUNTER_COIL):
+                raise ValueError(f"A linha '{rung.identifier}' aciona temporizadores/contadores e não é combinacional.")
+            code.append(instruction)
+    return code
+
+
+def generate_truth_table(compiled_program, include_outputs=False, boolean_memories=None, word_size=64):
+    """
+    Enumera todas as combinações das entradas I1..I8 (e, opcionalmente, do estado anterior de O1..O8)
+    e calcula o resultado de uma varredura para cada uma.
+    A avaliação é paralela em bits: cada palavra de 'word_size' bits avalia 'word_size' combinações
+    com uma única passada pelas instruções. As memórias B partem de 'boolean_memories' (padrão: False).
+    """
+    if word_size < 1 or word_size & (word_size - 1):
+        raise ValueError(f"word_size deve ser uma potência de 2: {word_size}")
+    code = _combinational_code(compiled_program)
+    variables = [f"I{i + 1}" for i in range(IO_COUNT)]
+    if include_outputs:
+        variables += [f"O{i + 1}" for i in range(IO_COUNT)]
+    initial_booleans = list(boolean_memories or [False] * BOOLEAN_COUNT)
+
+    combinations = 1 << len(variables)
+    word_size = min(word_size, combinations)
+    full = (1 << word_size) - 1
+    low_patterns = _lane_patterns(len(variables), word_size)
+    output_masks = []
+    boolean_masks = []
+
+    for base in range(0, combinations, word_size):
+        patterns = low_patterns + [
+            full if base >> bit & 1 else 0 for bit in range(len(low_patterns), len(variables))
+        ]
+        inputs = patterns[:IO_COUNT]
+        outputs = patterns[IO_COUNT:] if include_outputs else [0] * IO_COUNT
+        booleans = [full if value else 0 for value in initial_booleans]
+
+        _evaluate_word(code, inputs, outputs, booleans, full)
+
+        # Transpõe os lanes de volta para uma máscara por combinação
+        for lane in range(word_size):
+            output_mask = 0
+            for i, word in enumerate(outputs):
+                if word >> lane & 1:
+                    output_mask |= 1 << i
+            boolean_mask = 0
+            for i, word in enumerate(booleans):
+                if word >> lane & 1:
+                    boolean_mask |= 1 << i
+            output_masks.append(output_mask)
+            boolean_masks.append(boolean_mask)
+
+    return TruthTable(variables, output_masks, boolean_masks)
+
+
+def format_truth_table(table):
+    """
+    Formata a tabela verdade como texto: uma linha por combinação com variáveis e saídas O1..O8.
+    """
+    header = ' '.join(table.variables) + ' | ' + ' '.join(f"O{i + 1}" for i in range(IO_COUNT))
+    lines = [header]
+    for combination, output_mask in enumerate(table.outputs):
+        values = ' '.join(str(combination >> bit & 1).rjust(len(name)) for bit, name in enumerate(table.variables))
+        results = ' '.join(str(output_mask >> i & 1).rjust(2) for i in range(IO_COUNT))
+        lines.append(f"{values} | {results}")
+    return '\n'.join(lines)
@@ -0,0 +1,23 @@
+import pytest
+
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.packed import PackedScanCycle
+from scan_cycle.scan_cycle import ScanCycle
+
+
+@pytest.fixture
+def make_cycle():
+    """
+    Cria um ciclo de varredura em RUN com o programa carregado. 'packed' usa PackedScanCycle;
+    as demais opções (change_driven, timebase, ...) são repassadas ao construtor.
+    """
+    def factory(program_lines, backend='rpn', **options):
+        if backend == 'packed':
+            cycle = PackedScanCycle(logical_structure=LogicalStructure([]), **options)
+        else:
+            cycle = ScanCycle(logical_structure=LogicalStructure([]), backend=backend, **options)
+        cycle.user_program = program_lines
+        cycle.set_mode('RUN')
+        return cycle
+
+    return factory
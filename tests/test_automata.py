@@ -0,0 +1,67 @@
+import pytest
+
+import automata.sentence_interpreter as senInt
+from automata.automaton import STATES, Automaton
+from automata.lexer import LexerError, lex
+from scan_cycle.compiler import CompiledRung, LineCompileCache, compile_line
+
+
+@pytest.mark.parametrize('sentence', [
+    'O1 = I1 ^ I2',
+    'B1=(I1 | O2)^(!I3)',
+    'O1 = (I1 | O1) ^ !(I1 ^ I2)',
+    'TON1 = I1 ^ I2',
+    'O1 = I3 ^ TONO1',
+])
+def test_valid_sentences_are_accepted(sentence):
+    assert senInt.interpretSentence(sentence) == 0
+
+
+@pytest.mark.parametrize('sentence', ['O1 = I1 ^', 'O1 = (I1 | I2', 'O1 = I1 | I2)', 'I1 = O1'])
+def test_syntax_errors_are_rejected(sentence):
+    assert senInt.interpretSentence(sentence) == 1
+
+
+def test_automata_share_states_but_not_stacks():
+    first = Automaton()
+    second = Automaton()
+    assert first.states is STATES and second.states is STATES
+    assert len(Automaton().states) == 14
+    first.pushToStack('$')
+    assert second.stack == []
+
+
+def test_transition_table_falls_back_to_empty_transition():
+    automaton = Automaton()
+    transition, isEmpty = automaton.transition(4, '|')
+    assert transition.targetState == 6 and not isEmpty
+    transition, isEmpty = automaton.transition(4, 'i')
+    assert transition.targetState == 10 and isEmpty
+    assert automaton.transition(2, 'i') == (None, False)
+
+
+@pytest.mark.parametrize('sentence', ['B9 = I1', 'B32 = B17 | I8', 'TON32 = I1', 'O1 = TONO12 ^ !TOFO32'])
+def test_addresses_above_eight_are_accepted(sentence):
+    assert senInt.interpretSentence(sentence) == 0
+
+
+@pytest.mark.parametrize('sentence', ['O1 = I9', 'B33 = I1', 'CUP9 = I1', 'O1 = X1', 'O1 = I1 & I2', 'O0 = I1'])
+def test_unknown_labels_are_label_errors(sentence):
+    assert senInt.interpretSentence(sentence) == 2
+
+
+def test_lexer_classifies_each_label_in_one_pass():
+    tokens = lex('o1 = (TONO2|CDN3)^!b17')
+    assert [token.kind for token in tokens] == ['o', '=', '(', 'tono', '|', 'cdn', ')', '^', '!', 'b']
+    assert [token.index for token in tokens if token.index] == [1, 2, 3, 17]
+    assert tokens[3].text == 'TONO2'
+    with pytest.raises(LexerError):
+        lex('O1 = I1 I')
+
+
+def test_blanks_inside_labels_are_ignored():
+    assert senInt.interpretSentence('TON 1 = I 1 ^ !TONO 1') == 0
+    assert [token.text for token in lex('O 1 = CDN O 2')] == ['O1', '=', 'CDNO2']
+    rung = compile_line('TON 1 = I 1 ^ !TONO 1')
+    assert rung == CompiledRung('TON1', ('I1', 'TONO1', 'NOT', '^', 'TON1'))
+    assert LineCompileCache().validate('TON 1 = I 1').timers == (('TON', '1'),)
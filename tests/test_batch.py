@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.scan_cycle import ScanCycle
+
+np = pytest.importorskip('numpy')
+
+from scan_cycle.batch import BatchScanCycle  # noqa: E402
+
+PROGRAM = [
+    'TON1 = I1 ^ !I2',
+    'TOF2 = I3',
+    'CUP1 = I4 | TONO1',
+    'O1 = TONO1 | (O1 ^ !I5)',
+    'O2 = TOFO2 ^ CUPO1',
+    'B3 = (I6 | B3) ^ !I7',
+    'O3 = B3 | (I8 ^ O2)',
+]
+
+
+def test_batch_matches_individual_scan_cycles():
+    size, scans = 16, 40
+    rng = random.Random(3)
+    input_trace = [[[rng.random() < 0.5 for _ in range(8)] for _ in range(size)] for _ in range(scans)]
+
+    cycles = []
+    for _ in range(size):
+        cycle = ScanCycle(logical_structure=LogicalStructure([]), backend='resolved')
+        cycle.user_program = PROGRAM
+        cycle.timers['T1'].preset = 3
+        cycle.timers['T2'].preset = 2
+        cycle.set_mode('RUN')
+        cycles.append(cycle)
+    batch = BatchScanCycle.from_scan_cycle(cycles[0], size)
+
+    for inputs in input_trace:
+        batch.inputs = np.array(inputs, dtype=bool)
+        batch.scan()
+        for scenario, cycle in enumerate(cycles):
+            cycle.inputs = list(inputs[scenario])
+            cycle.scan()
+            assert batch.outputs[scenario].tolist() == cycle.outputs
+            assert batch.boolean_memories[scenario].tolist() == cycle.boolean_memories
+            assert batch.counter_counts[scenario, 0] == cycle.counters['C1'].count
+            assert batch.timer_remaining[scenario, 0] == cycle.timers['T1'].remaining_time
+
+
+def test_batch_evaluates_all_input_patterns():
+    patterns = np.array([[(n >> bit) & 1 for bit in range(8)] for n in range(256)], dtype=bool)
+    batch = BatchScanCycle(256, ['O1 = I1 ^ I2', 'O2 = !(I3 | I4)'])
+    batch.inputs = patterns
+    batch.scan()
+    assert (batch.outputs[:, 0] == (patterns[:, 0] & patterns[:, 1])).all()
+    assert (batch.outputs[:, 1] == ~(patterns[:, 2] | patterns[:, 3])).all()
@@ -0,0 +1,23 @@
+import json
+
+import benchmark
+
+
+def test_benchmark_writes_comparable_results(tmp_path, capsys):
+    first = tmp_path / 'first.json'
+    args = ['-n', '20', '-w', 'prog1', '-w', 'timers', '-b', 'resolved', '-b', 'packed']
+    assert benchmark.main(args + ['-o', str(first)]) == 0
+    results = json.loads(first.read_text())
+    assert set(results['workloads']) == {'prog1', 'timers'}
+    result = results['workloads']['timers']['backends']['packed']
+    assert result['scans'] == 20 and result['scans_per_second'] > 0
+    assert result['latency_us']['p50'] <= result['latency_us']['p99'] <= result['latency_us']['max']
+    capsys.readouterr()
+
+    assert benchmark.main(args + ['--compare', str(first)]) == 0
+    assert 'x' in capsys.readouterr().out.splitlines()[1]
+
+
+def test_input_sequence_is_reproducible():
+    assert benchmark.input_sequence(50, seed=3) == benchmark.input_sequence(50, seed=3)
+    assert benchmark.input_sequence(50, seed=3) != benchmark.input_sequence(50, seed=4)
@@ -0,0 +1,193 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('serial')
+
+import communication as comm  # noqa: E402
+
+
+class FakeArduino:
+    """
+    Serial port double that answers binary frames like arduino_code/principal.ino.
+    With delay, responses become readable only after that many seconds.
+    """
+
+    def __init__(self, buttons='10100000', delay=0.0):
+        self.buttons = buttons
+        self.delay = delay
+        self.timeout = None
+        self.leds = None
+        self.corrupt = False  # Responde com checksum inválido
+        self.writes = []
+        self._buffer = bytearray()
+        self._ready_at = 0.0
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        self.writes.append(data)
+        with self._lock:
+            for offset in range(0, len(data), comm.FRAME_SIZE):
+                start, sequence, command, value, checksum = data[offset:offset + comm.FRAME_SIZE]
+                assert start == comm.FRAME_REQUEST_START and checksum == sequence ^ command ^ value
+                if command == comm.FRAME_HELLO:
+                    value = comm.PROTOCOL_VERSION
+                elif command == comm.FRAME_EXCHANGE:
+                    self.leds = value
+                    value = sum(1 << i for i, state in enumerate(self.buttons) if state == '1')
+                response = comm.encodeFrame(sequence, command, value, start=comm.FRAME_RESPONSE_START)
+                if self.corrupt:
+                    response = response[:-1] + bytes((response[-1] ^ 1,))
+                self._buffer += response
+            self._ready_at = time.monotonic() + self.delay
+        return len(data)
+
+    def read(self, size):
+        deadline = time.monotonic() + (self.timeout or 0)
+        while True:
+            with self._lock:
+                if time.monotonic() >= self._ready_at and len(self._buffer) >= size:
+                    data = bytes(self._buffer[:size])
+                    del self._buffer[:size]
+                    return data
+            if time.monotonic() >= deadline:
+                with self._lock:
+                    data = bytes(self._buffer[:size]) if time.monotonic() >= self._ready_at else b''
+                    del self._buffer[:len(data)]
+                    return data
+            time.sleep(0.001)
+
+    def reset_input_buffer(self):
+        # Só descarta o que já chegou; uma resposta atrasada ainda chega depois
+        with self._lock:
+            if time.monotonic() >= self._ready_at:
+                self._buffer.clear()
+
+
+@pytest.fixture
+def transport_factory():
+    transports = []
+
+    def factory(port, **kwargs):
+        transport = comm.SerialTransport(port, **kwargs).start()
+        transports.append(transport)
+        return transport
+
+    yield factory
+    for transport in transports:
+        transport.stop(timeout=2)
+
+
+def test_decode_buttons():
+    assert comm.decodeButtons(b'@10000001#') == (True,) + (False,) * 6 + (True,)
+    with pytest.raises(ValueError):
+        comm.decodeButtons(b'@1000x001#')
+    assert comm.encodeLedByte(0b101) == b'@10100000#'
+
+
+def test_frame_round_trip_and_validation():
+    frame = comm.encodeFrame(7, comm.FRAME_EXCHANGE, 0x81, start=comm.FRAME_RESPONSE_START)
+    assert len(frame) == comm.FRAME_SIZE
+    assert comm.decodeFrame(frame, 7, comm.FRAME_EXCHANGE) == 0x81
+    with pytest.raises(ValueError, match='checksum'):
+        comm.decodeFrame(frame[:-1] + b'\x00', 7, comm.FRAME_EXCHANGE)
+    with pytest.raises(ValueError, match='sequence'):
+        comm.decodeFrame(frame, 8, comm.FRAME_EXCHANGE)
+    with pytest.raises(ValueError, match='rejected'):
+        comm.decodeFrame(comm.encodeFrame(7, comm.FRAME_ERROR, 0, start=comm.FRAME_RESPONSE_START),
+                         7, comm.FRAME_EXCHANGE)
+
+
+def test_handshake_and_exchange_in_one_frame(transport_factory):
+    port = FakeArduino()
+    transport = transport_factory(port)
+    assert transport.handshake().result(timeout=2) is True
+    inputs = transport.exchange(0b11).result(timeout=2)
+    assert inputs == (True, False, True, False, False, False, False, False)
+    assert port.leds == 0b11
+    assert len(port.writes[-1]) == comm.FRAME_SIZE  # Saídas e entradas em um único quadro de ida e volta
+    assert transport.latest.inputs == inputs
+
+
+def test_corrupted_response_is_rejected(transport_factory):
+    port = FakeArduino()
+    port.corrupt = True
+    transport = transport_factory(port)
+    with pytest.raises(ValueError):
+        transport.exchange(1).result(timeout=2)
+    assert transport.latest is None
+    port.corrupt = False
+    assert transport.exchange(1).result(timeout=2)[0] is True
+
+
+def test_exchange_does_not_block_and_coalesces_pending_scans(transport_factory):
+    port = FakeArduino(delay=0.05)
+    transport = transport_factory(port)
+    start = time.monotonic()
+    futures = [transport.exchange(value) for value in range(20)]
+    assert time.monotonic() - start < 0.05
+    for future in futures:
+        future.result(timeout=2)
+    # Enquanto uma troca estava em andamento, as seguintes foram fundidas em uma só
+    assert len(port.writes) < 20
+    assert port.leds == 19
+    assert transport.latest is not None
+
+
+def test_request_timeout_fails_only_that_request(transport_factory):
+    port = FakeArduino(delay=0.2)
+    transport = transport_factory(port, timeout=0.05)
+    future = transport.exchange(1)
+    with pytest.raises(TimeoutError):
+        future.result(timeout=2)
+    assert transport.timeouts == 1
+    assert transport.latest is None
+
+    # A resposta atrasada chega depois: pelo número de sequência ela é descartada, e a troca
+    # seguinte recebe a sua própria resposta
+    time.sleep(0.25)
+    port.delay = 0
+    assert transport.exchange(2, timeout=1).result(timeout=2)[0] is True
+    assert transport.timeouts == 1
+    assert transport.latest.inputs[0] is True
+
+
+def test_ring_buffer_keeps_latest_readings(transport_factory):
+    port = FakeArduino()
+    transport = transport_factory(port, history=3)
+    for value in range(5):
+        transport.exchange(value).result(timeout=2)
+    assert len(transport.readings) == 3
+    assert transport.latest is transport.readings[-1]
+
+
+def test_requests_after_stop_fail(transport_factory):
+    transport = transport_factory(FakeArduino())
+    transport.stop(timeout=2)
+    with pytest.raises(ConnectionError):
+        transport.exchange(0).result(timeout=1)
+
+
+def test_reconnect_waits_for_previous_io_thread(transport_factory):
+    port = FakeArduino(delay=0.3)
+    old = transport_factory(port, timeout=0.2)
+    stale = old.exchange(1)
+    time.sleep(0.02)  # A thread antiga fica bloqueada lendo a resposta
+    old.stop(timeout=0)
+
+    port.delay = 0
+    writes = []
+    original_write = port.write
+
+    def write(data):
+        writes.append(old._thread.is_alive())
+        return original_write(data)
+
+    port.write = write
+    new = transport_factory(port, previous=old)
+    assert new.handshake(timeout=2).result(timeout=3) is True
+    assert writes == [False]  # O novo transporte só escreveu depois que a thread antiga saiu da porta
+    with pytest.raises(TimeoutError):
+        stale.result(timeout=1)
+    assert new.exchange(0b10).result(timeout=2)[0] is True
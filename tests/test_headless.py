@@ -0,0 +1,41 @@
+import os
+
+import headless
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'example_programs')
+
+
+def test_headless_runs_program_and_reports_state(capsys):
+    program = os.path.join(EXAMPLES_DIR, 'prog6.txt')
+    exit_code = headless.main([program, '-n', '10', '-i', '11100000', '--timer', 'T1=3', '-b', 'resolved'])
+    output = capsys.readouterr().out
+    assert exit_code == 0
+    assert 'Varreduras: 10' in output
+    assert 'Saídas   (O1..O8): 11000000' in output
+
+
+def test_headless_rejects_invalid_program(tmp_path, capsys):
+    program = tmp_path / 'invalido.txt'
+    program.write_text('O1 = I1 ^\n')
+    assert headless.main([str(program), '-n', '1']) == 1
+    assert 'Erro de sintaxe na linha 1' in capsys.readouterr().err
+
+
+def test_headless_profiles_rungs_only_on_request(capsys):
+    program = os.path.join(EXAMPLES_DIR, 'prog5.txt')
+    assert headless.main([program, '-n', '10', '-b', 'codegen', '--stats']) == 0
+    output = capsys.readouterr().out
+    assert 'Tempo de varredura' in output and 'linha ' not in output
+
+    assert headless.main([program, '-n', '10', '-b', 'resolved', '--profile-rungs']) == 0
+    assert 'linha ' in capsys.readouterr().out
+
+    assert headless.main([program, '-n', '10', '-b', 'codegen', '--profile-rungs']) == 1
+    assert 'codegen' in capsys.readouterr().err
+
+
+def test_headless_rejects_change_driven_without_resolved_backend(capsys):
+    program = os.path.join(EXAMPLES_DIR, 'prog5.txt')
+    for backend in ('codegen', 'packed'):
+        assert headless.main([program, '-n', '10', '-b', backend, '--change-driven']) == 1
+        assert "requer o backend 'resolved'" in capsys.readouterr().err
@@ -0,0 +1,43 @@
+import io
+import logging
+
+import pytest
+
+import automata.sentence_interpreter as senInt
+import clp_logging
+from components.timer import Timer
+
+
+def test_parse_log_spec():
+    assert clp_logging.parse_log_spec('WARNING,timer=DEBUG, serial=info') == (
+        'WARNING', {'timer': 'DEBUG', 'serial': 'INFO'}
+    )
+    with pytest.raises(ValueError):
+        clp_logging.parse_log_spec('timer=LOUD')
+    with pytest.raises(ValueError):
+        clp_logging.parse_log_spec('gui=DEBUG')
+
+
+def test_silent_by_default(capsys):
+    assert senInt.interpretSentence('O1 = I1 ^ !I2') == 0
+    Timer(name='T1').start(3)
+    captured = capsys.readouterr()
+    assert captured.out == '' and captured.err == ''
+
+
+def test_subsystem_levels_are_independent():
+    stream = io.StringIO()
+    root = logging.getLogger(clp_logging.ROOT_LOGGER)
+    handlers = list(root.handlers)
+    try:
+        clp_logging.configure_logging('WARNING,timer=DEBUG', stream=stream)
+        Timer(name='T7').start(3)
+        senInt.interpretSentence('O1 = I1')
+    finally:
+        for handler in root.handlers[len(handlers):]:
+            root.removeHandler(handler)
+        for name in (clp_logging.ROOT_LOGGER,) + tuple(f'clp.{subsystem}' for subsystem in clp_logging.SUBSYSTEMS):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+    output = stream.getvalue()
+    assert 'clp.timer DEBUG: Started ON DELAY timer T7' in output
+    assert 'clp.automaton' not in output
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+import automata.sentence_interpreter as senInt
+from scan_cycle.program_generator import GeneratorConfig, generate_program
+
+
+@pytest.mark.parametrize('depth', [0, 1, 3])
+@pytest.mark.parametrize('fan_in', [1, 2, 4])
+def test_generated_programs_pass_the_automaton(depth, fan_in):
+    config = GeneratorConfig(rungs=30, depth=depth, fan_in=fan_in, timer_density=0.2, counter_density=0.1,
+                             negation_probability=0.5, seed=depth * 10 + fan_in)
+    program = generate_program(config)
+    assert len(program) == 30
+    assert [line for line in program if senInt.interpretSentence(line) != 0] == []
+
+
+def test_generator_is_reproducible_and_places_coils():
+    config = GeneratorConfig(rungs=40, timer_density=0.25, counter_density=0.1, seed=5)
+    program = generate_program(config)
+    assert program == generate_program(config)
+    assert program != generate_program(config._replace(seed=6))
+    targets = [line.split(' = ')[0] for line in program]
+    assert sum(target[:3] in ('TON', 'TOF') for target in targets) == 10
+    assert sum(target[:3] in ('CUP', 'CDN') for target in targets) == 4
+
+
+def set_presets(cycle):
+    for index, timer in enumerate(cycle.timer_list):
+        timer.preset = index % 4 + 1
+    return cycle
+
+
+def fuzz_trace(cycle, seed, scans=80):
+    rng = random.Random(seed)
+    trace = []
+    for _ in range(scans):
+        if rng.random() < 0.5:
+            index = rng.randrange(8)
+            cycle.set_input(index, not cycle.inputs[index])
+        cycle.scan()
+        trace.append((list(cycle.outputs), list(cycle.boolean_memories),
+                      [timer.triggered for timer in cycle.timer_list], [counter.count for counter in cycle.counter_list]))
+    return trace
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_backends_agree_on_generated_programs(seed, make_cycle):
+    program = generate_program(GeneratorConfig(rungs=25, depth=2, fan_in=3, timer_density=0.2, counter_density=0.1,
+                                               seed=seed))
+    reference = fuzz_trace(set_presets(make_cycle(program, 'rpn')), seed)
+    for backend in ('resolved', 'optimized', 'codegen', 'packed'):
+        assert fuzz_trace(set_presets(make_cycle(program, backend)), seed) == reference, backend
+    driven = make_cycle(program, 'resolved', change_driven=True)
+    assert fuzz_trace(set_presets(driven), seed) == reference, 'change-driven'
@@ -0,0 +1,348 @@
+import os
+import random
+
+import pytest
+
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.compiler import compile_program, convert_to_rpn
+from scan_cycle.instructions import BANK_BOOLEAN, BANK_INPUT, BANK_OUTPUT, OP_LOAD, OP_STORE, OP_TIMER_COIL
+from scan_cycle.optimizer import OP_CONST, OP_JUMP_IF_FALSE_OR_POP, OP_JUMP_IF_TRUE_OR_POP, optimize_program
+from scan_cycle.scan_cycle import ScanCycle
+from scan_cycle.truth_table import generate_truth_table
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'example_programs')
+
+
+def load_example(name):
+    with open(os.path.join(EXAMPLES_DIR, name)) as file:
+        return file.read().strip().splitlines()
+
+
+EXAMPLE_PROGRAMS = sorted(name for name in os.listdir(EXAMPLES_DIR) if name.endswith('.txt'))
+
+
+def run_scan(cycle, inputs):
+    cycle.inputs = list(inputs)
+    cycle.scan()
+    return list(cycle.outputs)
+
+
+def random_trace(cycle, seed, scans=60):
+    rng = random.Random(seed)
+    trace = []
+    for _ in range(scans):
+        inputs = [rng.random() < 0.5 for _ in range(8)]
+        outputs = run_scan(cycle, inputs)
+        trace.append((outputs, list(cycle.boolean_memories), [t.triggered for t in cycle.timer_list]))
+    return trace
+
+
+def test_convert_to_rpn_handles_not_and_precedence():
+    assert convert_to_rpn('I1 ^ !I3 | I2') == ['I1', 'I3', 'NOT', '^', 'I2', '|']
+    assert convert_to_rpn('!(I1 ^ I2)') == ['I1', 'I2', '^', 'NOT']
+
+
+def test_compile_program_skips_blank_and_comment_lines():
+    compiled = compile_program(['# comentário', '', 'O1 = I1 ^ I2', 'sem atribuicao'])
+    assert len(compiled) == 1
+    assert compiled[0].identifier == 'O1'
+    assert compiled[0].instructions == ('I1', 'I2', '^', 'O1')
+
+
+def test_user_program_is_compiled_on_assignment(make_cycle):
+    cycle = make_cycle(['O1 = I1'])
+    first = cycle.compiled_program
+    cycle.user_program = ['O2 = I2']
+    assert cycle.compiled_program != first
+    assert cycle.compiled_program[0].identifier == 'O2'
+
+
+def test_self_holding_rung_reads_its_own_output(make_cycle):
+    # O1 aparece como operando e como destino; apenas o último token é atribuição
+    cycle = make_cycle(['O1 = (I1 | O1) ^ !I2'])
+    assert run_scan(cycle, [True, False] + [False] * 6)[0] is True
+    assert run_scan(cycle, [False] * 8)[0] is True
+    assert run_scan(cycle, [False, True] + [False] * 6)[0] is False
+
+
+def test_prog1_copies_inputs_to_outputs(make_cycle):
+    cycle = make_cycle(load_example('prog1.txt'))
+    pattern = [True, False, True, True, False, False, True, False]
+    assert run_scan(cycle, pattern) == pattern
+
+
+def test_prog6_on_delay_timer(make_cycle):
+    cycle = make_cycle(load_example('prog6.txt'))
+    cycle.timers['T1'].preset = 3
+    inputs = [True, True, True] + [False] * 5
+    outputs = [run_scan(cycle, inputs)[0] for _ in range(5)]
+    assert outputs == [False, False, False, True, True]
+
+
+def test_resolved_program_has_no_text_operands(make_cycle):
+    cycle = make_cycle(['O1 = (I1 | O1) ^ !TONO2', 'TON2 = I3', 'CUP1 = I4'], backend='resolved')
+    for opcode, arg1, arg2 in cycle.resolved_program:
+        assert isinstance(opcode, int)
+
+
+def test_invalid_backend_is_rejected():
+    with pytest.raises(ValueError):
+        ScanCycle(logical_structure=LogicalStructure([]), backend='fpga')
+
+
+@pytest.mark.parametrize('backend', ['resolved', 'optimized', 'codegen', 'packed'])
+@pytest.mark.parametrize('example', EXAMPLE_PROGRAMS)
+def test_backend_matches_rpn_on_examples(example, backend, make_cycle):
+    traces = []
+    for name in ('rpn', backend):
+        cycle = make_cycle(load_example(example), backend=name)
+        cycle.timers['T1'].preset = 2
+        traces.append(random_trace(cycle, seed=example))
+    assert traces[0] == traces[1]
+
+
+def test_codegen_source_for_rung(make_cycle):
+    cycle = make_cycle(['O3 = (I1 | O3) ^ !I2'], backend='codegen')
+    assert 'mo[2] = ((mi[0] or mo[2]) and (not mi[1]))' in cycle.generated_source
+
+
+def long_chain(target, operator, terms):
+    # Cadeia aceita pelo autômato: os termos do meio de uma sequência longa precisam ser grupos
+    middle = ''.join(f' {operator} (I{index % 8 + 1})' for index in range(1, terms - 1))
+    return f'{target} = I1{middle} {operator} I2'
+
+
+def deeply_nested(target, levels):
+    expression = 'I1 ^ I2'
+    for level in range(levels):
+        expression = f"I{level % 8 + 1} {'|^'[level % 2]} ({expression})"
+    return f'{target} = {expression}'
+
+
+@pytest.mark.parametrize('backend', ['codegen', 'packed'])
+def test_generated_code_handles_long_chains_and_deep_nesting(backend, make_cycle):
+    program = [long_chain('O1', '^', 300), long_chain('O2', '|', 300), deeply_nested('O3', 250)]
+    traces = [random_trace(make_cycle(program, backend=name), seed=3, scans=40) for name in ('rpn', backend)]
+    assert traces[0] == traces[1]
+
+
+def test_optimizer_handles_expressions_deeper_than_the_recursion_limit(make_cycle):
+    program = [long_chain('O1', '^', 1000), long_chain('O2', '|', 1000), deeply_nested('O3', 1000),
+               'O4 = (I1 ^ I2) | (I1 ^ I2) | (I1 ^ I2)']
+    _, report = optimize_program(compile_program(program))
+    assert report.hoisted == 1
+    traces = [random_trace(make_cycle(program, backend=name), seed=3, scans=40) for name in ('rpn', 'optimized')]
+    assert traces[0] == traces[1]
+
+
+@pytest.mark.parametrize('backend', ['resolved', 'optimized', 'codegen', 'packed'])
+def test_backend_matches_rpn_with_timers_and_counters(backend, make_cycle):
+    program = ['CUP1 = I1 ^ I2', 'O1 = CUPO1 | I3', 'TOF2 = I4', 'O2 = TOFO2 ^ !I5', 'B3 = O1 | B3']
+    results = []
+    for name in ('rpn', backend):
+        cycle = make_cycle(program, backend=name)
+        cycle.timers['T2'].preset = 2
+        results.append((random_trace(cycle, seed=7, scans=200), cycle.counters['C1'].count))
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize('backend', ['rpn', 'packed'])
+def test_led_byte_and_set_input(backend, make_cycle):
+    cycle = make_cycle(load_example('prog1.txt'), backend=backend)
+    cycle.set_input(0, True)
+    cycle.set_input(5, True)
+    cycle.scan()
+    assert cycle.led_byte() == 0b00100001
+
+
+@pytest.mark.parametrize('example', ['prog2.txt', 'prog5.txt'])
+def test_truth_table_matches_single_scans(example, make_cycle):
+    program = load_example(example)
+    table = generate_truth_table(compile_program(program), include_outputs=True)
+    assert len(table.outputs) == 1 << 16
+    for combination in range(0, 1 << 16, 97):
+        cycle = make_cycle(program, backend='resolved')
+        cycle.memory_image_outputs = [bool(combination >> (8 + i) & 1) for i in range(8)]
+        run_scan(cycle, [bool(combination >> i & 1) for i in range(8)])
+        assert cycle.led_byte() == table.outputs[combination]
+
+
+def test_truth_table_rejects_timers():
+    with pytest.raises(ValueError):
+        generate_truth_table(compile_program(load_example('prog6.txt')))
+
+
+def test_compile_cache_only_processes_edited_lines(monkeypatch):
+    import automata.sentence_interpreter as senInt
+    from scan_cycle.compiler import LineCompileCache
+
+    validated = []
+    original = senInt.interpretSentence
+    monkeypatch.setattr(senInt, 'interpretSentence', lambda line: validated.append(line) or original(line))
+
+    cache = LineCompileCache()
+    program = load_example('prog5.txt')
+    first = cache.compile_program(program)
+    cache.validate_program(program)
+    assert len(validated) == len(program)
+
+    edited = list(program)
+    edited[3] = 'TON9 = I4 | O3'
+    validated.clear()
+    validations = cache.validate_program(edited)
+    second = cache.compile_program(edited)
+    assert validated == ['TON9 = I4 | O3']
+    assert validations[3].timers == (('TON', '9'),)
+    assert second[0] is first[0] and second[3] is not first[3]
+
+
+@pytest.mark.parametrize('backend', ['rpn', 'resolved', 'optimized', 'codegen', 'packed'])
+def test_hot_swap_preserves_state_between_scans(backend, make_cycle):
+    cycle = make_cycle(['TON1 = I1', 'TON2 = I1', 'CUP1 = I2', 'B5 = I1 | B5', 'O1 = TONO1'], backend=backend)
+    cycle.timers['T1'].preset = 5
+    cycle.timers['T2'].preset = 5
+    run_scan(cycle, [True, True] + [False] * 6)
+    run_scan(cycle, [True, False] + [False] * 6)
+    run_scan(cycle, [True, True] + [False] * 6)
+    assert cycle.counters['C1'].count == 2
+    remaining = cycle.timers['T1'].remaining_time
+
+    cycle.hot_swap(['TON1 = I1', 'CUP1 = I2', 'O2 = TONO1 | B5'])
+    assert cycle.compiled_program[0].identifier == 'TON1' and len(cycle.compiled_program) == 5  # ainda não trocado
+
+    run_scan(cycle, [True, True] + [False] * 6)
+    assert len(cycle.compiled_program) == 3
+    assert cycle.timers['T1'].remaining_time == remaining - 1
+    assert not cycle.timers['T2'].isActive
+    assert cycle.counters['C1'].count == 2
+    assert cycle.boolean_memories[4] is True
+    assert cycle.outputs[1] is True
+
+
+def test_pending_hot_swap_is_applied_on_stop_and_superseded_by_load_program(make_cycle):
+    cycle = make_cycle(['O1 = I1'])
+    cycle.hot_swap(['O2 = I1'])
+    cycle.set_mode('STOP')
+    assert cycle.pending_program is None and cycle.compiled_program[0].identifier == 'O2'
+    cycle.load_program(['O3 = I1'])
+    cycle.set_mode('RUN')
+    assert run_scan(cycle, [True] + [False] * 7)[:3] == [False, False, True]
+
+    cycle.hot_swap(['O4 = I1'])
+    cycle.load_program(['O5 = I1'])
+    assert run_scan(cycle, [True] + [False] * 7)[3:5] == [False, True]
+
+    cycle.hot_swap(['O6 = I1'])
+    cycle.initialize_system()
+    assert cycle.compiled_program[0].identifier == 'O6'
+
+
+@pytest.mark.parametrize('backend', ['rpn', 'resolved', 'optimized', 'codegen'])
+def test_pending_hot_swap_follows_backend_change(backend, make_cycle):
+    cycle = make_cycle(['O1 = I1'], backend='resolved')
+    cycle.hot_swap(['O2 = I1 ^ !I2'])
+    cycle.set_backend(backend)
+    assert run_scan(cycle, [True] + [False] * 7)[:2] == [False, True]
+
+
+def sparse_trace(cycle, seed, scans=300):
+    # Entradas mudam raramente, como em uma planta real: a maioria das linhas fica estável
+    rng = random.Random(seed)
+    inputs = [False] * 8
+    trace = []
+    for _ in range(scans):
+        if rng.random() < 0.2:
+            index = rng.randrange(8)
+            inputs[index] = not inputs[index]
+        outputs = run_scan(cycle, inputs)
+        trace.append((outputs, list(cycle.boolean_memories), [t.triggered for t in cycle.timer_list],
+                      [c.count for c in cycle.counter_list]))
+    return trace
+
+
+@pytest.mark.parametrize('example', EXAMPLE_PROGRAMS)
+def test_change_driven_matches_full_scan(example, make_cycle):
+    program = load_example(example) + ['CUP2 = I1 ^ !B4', 'O7 = CUPO2 | TONO3', 'TON3 = I2 | O7', 'B4 = I6']
+    traces = []
+    for change_driven in (False, True):
+        cycle = make_cycle(program, backend='resolved')
+        cycle.set_change_driven(change_driven)
+        cycle.timers['T1'].preset = 2
+        cycle.timers['T3'].preset = 4
+        traces.append(sparse_trace(cycle, seed=example))
+    assert traces[0] == traces[1]
+    assert cycle.rungs_skipped > 0
+
+
+def test_change_driven_reevaluates_rungs_after_timer_expiry_and_hot_swap(make_cycle):
+    cycle = make_cycle(['TON1 = I1', 'O1 = TONO1', 'O2 = I2'], backend='resolved')
+    cycle.set_change_driven(True)
+    cycle.timers['T1'].preset = 2
+    inputs = [True] + [False] * 7
+    outputs = [run_scan(cycle, inputs)[0] for _ in range(4)]
+    assert outputs == [False, False, True, True]
+    assert cycle.rung_dependencies[1].reads == ((3, 0),)
+
+    cycle.hot_swap(['TON1 = I1', 'O1 = !TONO1'])
+    assert run_scan(cycle, inputs)[:2] == [False, False]
+
+
+@pytest.mark.parametrize('coil, steps, expected', [
+    ('TON', [(0, 0), (0, 0), (1, 0), (1, 1), (1, 1), (1, 1), (1, 1), (1, 0)], [0, 0, 0, 0, 1, 1, 1, 0]),
+    ('TOF', [(0, 0), (0, 0), (1, 1), (0, 1), (0, 0)], [0, 0, 1, 1, 1]),
+])
+def test_change_driven_with_a_timer_coil_driven_by_two_rungs(coil, steps, expected, make_cycle):
+    # A segunda linha inicia ou zera a contagem sem mudar o contato: a primeira precisa ser reavaliada
+    program = [f'{coil}1 = I1', f'{coil}1 = I2', f'O1 = {coil}O1']
+    for backend, change_driven in (('rpn', False), ('resolved', True)):
+        cycle = make_cycle(program, backend=backend)
+        cycle.set_change_driven(change_driven)
+        cycle.timers['T1'].preset = 1
+        outputs = [run_scan(cycle, [bool(i1), bool(i2)] + [False] * 6)[0] for i1, i2 in steps]
+        assert outputs == [bool(value) for value in expected]
+
+
+def test_change_driven_requires_resolved_backend(make_cycle):
+    with pytest.raises(ValueError):
+        make_cycle(['O1 = I1'], backend='codegen').set_change_driven(True)
+    cycle = make_cycle(['O1 = I1'], backend='resolved')
+    cycle.set_change_driven(True)
+    with pytest.raises(ValueError):
+        cycle.set_backend('rpn')
+
+
+def test_optimizer_hoists_common_input_subexpressions(make_cycle):
+    cycle = make_cycle(load_example('prog5.txt'), backend='optimized')
+    report = cycle.optimization_report
+    assert report.hoisted == 1  # !(I1 ^ I2), repetido nas 8 linhas
+    assert report.removed_ops == report.original_ops - report.optimized_ops > 0
+    assert len(cycle.resolved_program) == report.optimized_ops
+
+
+def test_optimizer_folds_constants_and_double_negations():
+    program = ['O1 = !!I1', 'O2 = I2 | !I2', 'O3 = I3 ^ !I3 | B1', 'O4 = (I4 ^ I4) | (O4 ^ !!O4)']
+    code, report = optimize_program(compile_program(program))
+    assert code == (
+        (OP_LOAD, BANK_INPUT, 0), (OP_STORE, BANK_OUTPUT, 0),
+        (OP_CONST, True, None), (OP_STORE, BANK_OUTPUT, 1),
+        (OP_LOAD, BANK_BOOLEAN, 0), (OP_STORE, BANK_OUTPUT, 2),
+        (OP_LOAD, BANK_INPUT, 3), (OP_JUMP_IF_TRUE_OR_POP, 9, None), (OP_LOAD, BANK_OUTPUT, 3),
+        (OP_STORE, BANK_OUTPUT, 3),
+    )
+    assert report.removed_ops == 26 - 10
+
+
+def test_short_circuit_jumps_never_skip_the_coil(make_cycle):
+    code, _ = optimize_program(compile_program(['TON1 = I1 ^ (I2 | I3)']))
+    assert code == (
+        (OP_LOAD, BANK_INPUT, 0), (OP_JUMP_IF_FALSE_OR_POP, 5, None),
+        (OP_LOAD, BANK_INPUT, 1), (OP_JUMP_IF_TRUE_OR_POP, 5, None), (OP_LOAD, BANK_INPUT, 2),
+        (OP_TIMER_COIL, 0, 'TON'),
+    )
+    # I1 desligado salta o resto da expressão, mas a bobina ainda desliga o temporizador
+    cycle = make_cycle(['TON1 = I1 ^ (I2 | I3)'], backend='optimized')
+    cycle.timers['T1'].preset = 5
+    run_scan(cycle, [True, True] + [False] * 6)
+    assert cycle.timers['T1'].isActive
+    run_scan(cycle, [False, True] + [False] * 6)
+    assert not cycle.timers['T1'].isActive
@@ -0,0 +1,110 @@
+import time
+from collections import namedtuple
+
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.scan_cycle import ScanCycle
+from scan_cycle.scan_thread import ProcessSnapshot, ScanThread
+
+InputReading = namedtuple('InputReading', ['timestamp', 'inputs'])  # Mesmo formato de communication.InputReading
+
+
+def make_thread(period=0.01):
+    cycle = ScanCycle(logical_structure=LogicalStructure([]), backend='resolved')
+    cycle.user_program = ['O1 = I1 ^ I2', 'CUP1 = I3']
+    return cycle, ScanThread(cycle, period=period)
+
+
+def test_commands_are_applied_before_the_next_scan():
+    cycle, thread = make_thread()
+    thread.set_input(0, True)
+    thread.set_input(1, True)
+    thread.submit(cycle.set_mode, 'RUN')
+    assert cycle.inputs == [False] * 8  # Nada muda até a thread processar a fila
+    thread.run_once()
+    snapshot = thread.snapshot
+    assert isinstance(snapshot, ProcessSnapshot)
+    assert snapshot.mode == 'RUN' and snapshot.cycles == 1
+    assert snapshot.outputs[0] is True
+    assert snapshot.inputs[:2] == (True, True)
+
+
+def test_snapshot_is_immutable_and_not_updated_in_place():
+    cycle, thread = make_thread()
+    thread.submit(cycle.set_mode, 'RUN')
+    thread.run_once()
+    before = thread.snapshot
+    thread.set_input(2, True)
+    thread.run_once()
+    assert before.counters[0] == 0
+    assert thread.snapshot.counters[0] == 1
+    assert all(isinstance(field, (tuple, int, str, type(None))) for field in before)
+
+
+def test_stop_mode_does_not_scan():
+    cycle, thread = make_thread()
+    thread.set_input(0, True)
+    thread.run_once()
+    assert thread.snapshot.cycles == 0
+    assert thread.snapshot.outputs == (False,) * 8
+
+
+def test_failing_command_does_not_stop_the_thread():
+    cycle, thread = make_thread()
+    thread.submit(int, 'não é número')  # ValueError
+    thread.submit(cycle.set_mode, 'RUN')
+    thread.run_once()
+    assert thread.snapshot.mode == 'RUN'
+
+
+def test_thread_scans_periodically_until_stopped():
+    cycle, thread = make_thread(period=0.005)
+    cycle.enable_statistics(budget=1)
+    thread.set_input(0, True)
+    thread.set_input(1, True)
+    thread.submit(cycle.set_mode, 'RUN')
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while thread.snapshot.cycles < 5 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        thread.stop(timeout=5)
+    assert not thread.is_alive()
+    assert thread.snapshot.cycles >= 5
+    assert thread.snapshot.outputs[0] is True
+    assert thread.snapshot.status.startswith('Varredura: média')
+
+
+class FakeIO:
+    def __init__(self):
+        self.latest = None
+        self.sent = []
+
+    def exchange(self, led_byte):
+        self.sent.append(led_byte)
+
+
+def test_hardware_inputs_and_outputs_are_exchanged_once_per_period():
+    cycle, thread = make_thread()
+    io = FakeIO()
+    thread.attach_io(io)
+    thread.submit(cycle.set_mode, 'RUN')
+    thread.run_once()
+    assert io.sent == [0]
+
+    io.latest = InputReading(0.0, (True, True) + (False,) * 6)
+    thread.run_once()
+    assert io.sent == [0, 0b1]
+    assert thread.snapshot.outputs[0] is True
+
+    # Um clique na interface vale enquanto o botão físico não muda
+    thread.set_input(0, False)
+    thread.run_once()
+    assert thread.snapshot.outputs[0] is False
+    io.latest = InputReading(1.0, (True, False) + (False,) * 6)
+    thread.run_once()
+    assert thread.snapshot.inputs[:2] == (False, False)
+
+    thread.attach_io(None)
+    thread.run_once()
+    assert len(io.sent) == 4
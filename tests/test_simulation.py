@@ -0,0 +1,55 @@
+import pytest
+
+from components.timebase import VirtualClock
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.scan_cycle import ScanCycle
+from scan_cycle.simulation import InputEvent, Simulation
+
+PROGRAM = [
+    'TON1 = I1 ^ !O2',
+    'O1 = TONO1 | (O1 ^ !I2)',
+    'TOF2 = O1 ^ I3',
+    'O2 = TOFO2',
+    'CUP1 = O1',
+    'O3 = CUPO1',
+]
+EVENTS = [
+    InputEvent(5, 0, True),
+    InputEvent(900, 2, True),
+    InputEvent(1000, 1, True),
+    InputEvent(1001, 1, False),
+    InputEvent(1500, 2, False),
+    InputEvent(2500, 0, False),
+]
+
+
+def make_simulation():
+    cycle = ScanCycle(logical_structure=LogicalStructure([]), backend='resolved', timebase=VirtualClock())
+    cycle.user_program = PROGRAM
+    cycle.timers['T1'].preset = 600
+    cycle.timers['T2'].preset = 300
+    return Simulation(cycle)
+
+
+def test_fast_forward_matches_tick_by_tick_trace():
+    stepped = make_simulation()
+    reference = stepped.run(3000, EVENTS, fast_forward=False)
+    skipped = make_simulation()
+    trace = skipped.run(3000, EVENTS, fast_forward=True)
+    assert trace == reference
+    assert len(trace) > 2
+    assert skipped.scans < stepped.scans / 20
+
+
+def test_hours_of_simulated_time_with_few_scans():
+    simulation = make_simulation()
+    simulation.scan_cycle.timers['T1'].preset = 36000  # 1 hora
+    one_day = 24 * 36000
+    trace = simulation.run(one_day, [InputEvent(0, 0, True)])
+    assert trace[-1].tick == 36000 + 1
+    assert simulation.scans < 100
+
+
+def test_simulation_requires_virtual_clock():
+    with pytest.raises(ValueError):
+        Simulation(ScanCycle(logical_structure=LogicalStructure([])))
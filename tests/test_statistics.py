@@ -0,0 +1,97 @@
+import pytest
+
+from scan_cycle.statistics import PHASES, ScanStatistics
+
+PROGRAM = ['O1 = I1 ^ I2', 'CUP1 = I3', 'O2 = CUPO1 | (I4 ^ (I5 | I6))']
+
+
+@pytest.mark.parametrize('backend', ['rpn', 'resolved', 'optimized', 'codegen'])
+def test_instrumented_scan_matches_plain_scan(backend, make_cycle):
+    plain, instrumented = make_cycle(PROGRAM, backend), make_cycle(PROGRAM, backend)
+    statistics = instrumented.enable_statistics(budget=10, rung_profiling=backend in ('rpn', 'resolved'))
+    for step in range(20):
+        inputs = [bool(step >> bit & 1) for bit in range(8)]
+        plain.inputs = list(inputs)
+        instrumented.inputs = list(inputs)
+        plain.scan()
+        instrumented.scan()
+        assert instrumented.outputs == plain.outputs
+    assert instrumented.counters['C1'].count == plain.counters['C1'].count
+    assert statistics.scans == 20 == instrumented.cycles
+    assert statistics.min_ns <= statistics.average_ns <= statistics.max_ns
+    assert statistics.overruns == 0
+    summary = statistics.summary()
+    assert list(summary['phases']) == list(PHASES)
+    expected_rungs = {'O1', 'CUP1', 'O2'} if statistics.rung_profiling else set()
+    assert {name for name, _ in statistics.rung_costs(instrumented.compiled_program)} == expected_rungs
+
+
+def test_watchdog_counts_overruns():
+    statistics = ScanStatistics(budget=0.001)
+    statistics.record_scan([0] * len(PHASES), 500_000)
+    statistics.record_scan([0] * len(PHASES), 2_000_000)
+    assert statistics.overruns == 1 and statistics.last_overrun_scan == 2
+    assert statistics.percentile(0.99) == 2_000_000
+    assert 'estouros 1' in statistics.format_status()
+
+
+def test_rung_profiling_is_not_available_for_packed(make_cycle):
+    cycle = make_cycle(PROGRAM, 'packed')
+    cycle.enable_statistics()
+    with pytest.raises(ValueError):
+        cycle.enable_statistics(rung_profiling=True)
+
+
+@pytest.mark.parametrize('backend', ['optimized', 'codegen'])
+def test_rung_profiling_is_not_available_for_compiled_backends(backend, make_cycle):
+    cycle = make_cycle(PROGRAM, backend)
+    with pytest.raises(ValueError):
+        cycle.enable_statistics(rung_profiling=True)
+    cycle.enable_statistics(budget=1)
+    cycle.scan()
+    assert cycle.statistics.scans == 1
+
+
+def test_rung_profiling_is_not_available_with_change_driven(make_cycle):
+    cycle = make_cycle(PROGRAM, 'resolved', change_driven=True)
+    with pytest.raises(ValueError):
+        cycle.enable_statistics(rung_profiling=True)
+
+    profiled = make_cycle(PROGRAM, 'resolved')
+    profiled.enable_statistics(rung_profiling=True)
+    with pytest.raises(ValueError):
+        profiled.set_change_driven(True)
+    with pytest.raises(ValueError):
+        profiled.set_backend('codegen')
+    assert not profiled.change_driven and profiled.backend == 'resolved'
+
+
+def test_change_driven_statistics_keep_change_tracking(make_cycle):
+    full = make_cycle(['O1 = B1', 'B1 = I1'], 'resolved')
+    driven = make_cycle(['O1 = B1', 'B1 = I1'], 'resolved', change_driven=True)
+    driven.enable_statistics()
+    for cycle in (full, driven):
+        cycle.set_input(0, True)
+        cycle.scan()
+    driven.disable_statistics()
+    for _ in range(2):
+        full.scan()
+        driven.scan()
+    assert driven.outputs == full.outputs
+    assert driven.outputs[0] is True
+
+
+def test_rung_costs_follow_program_changes(make_cycle):
+    cycle = make_cycle(PROGRAM, 'resolved')
+    statistics = cycle.enable_statistics(rung_profiling=True)
+    for _ in range(3):
+        cycle.scan()
+    cycle.hot_swap(['B1 = I1'])
+    cycle.scan()
+    assert [name for name, _ in statistics.rung_costs(cycle.compiled_program)] == ['B1']
+    assert statistics.scans - statistics.rung_first_scan == 1
+
+    cycle.load_program(['O3 = I3', 'O4 = I4'])
+    assert statistics.rung_costs(cycle.compiled_program) == []
+    cycle.scan()
+    assert {name for name, _ in statistics.rung_costs(cycle.compiled_program)} == {'O3', 'O4'}
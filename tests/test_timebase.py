@@ -0,0 +1,54 @@
+from components.timebase import MonotonicTimeBase, VirtualClock
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.scan_cycle import ScanCycle
+
+
+class FakeClock:
+    def __init__(self):
+        self.value = 100.0
+
+    def __call__(self):
+        return self.value
+
+
+def make_timer_cycle(timebase):
+    cycle = ScanCycle(logical_structure=LogicalStructure([]), backend='resolved', timebase=timebase)
+    cycle.user_program = ['TON1 = I1', 'O1 = TONO1']
+    cycle.timers['T1'].preset = 10  # 1 segundo
+    cycle.set_mode('RUN')
+    cycle.inputs = [True] + [False] * 7
+    return cycle
+
+
+def test_monotonic_timebase_carries_fractions_of_a_tick():
+    clock = FakeClock()
+    timebase = MonotonicTimeBase(clock=clock)
+    timebase.reset()
+    clock.value += 0.25
+    assert timebase.elapsed_ticks() == 2
+    clock.value += 0.06
+    assert timebase.elapsed_ticks() == 1
+
+
+def test_timer_follows_wall_clock_not_scan_count():
+    clock = FakeClock()
+    cycle = make_timer_cycle(MonotonicTimeBase(clock=clock))
+    for _ in range(1000):
+        cycle.scan()
+    assert cycle.outputs[0] is False
+    clock.value += 1.0
+    cycle.scan()
+    assert cycle.outputs[0] is True
+
+
+def test_virtual_clock_only_moves_when_advanced():
+    clock = VirtualClock()
+    cycle = make_timer_cycle(clock)
+    cycle.scan()
+    clock.advance_seconds(0.9)
+    cycle.scan()
+    assert cycle.outputs[0] is False
+    assert cycle.timers['T1'].remaining_time == 1
+    clock.advance(1)
+    cycle.scan()
+    assert cycle.outputs[0] is True
@@ -0,0 +1,69 @@
+from components.timer import Timer
+from components.timer_scheduler import MIN_COMPACT_SIZE, TimerScheduler
+from reverse_polish_notation.logical_structure import LogicalStructure
+from scan_cycle.scan_cycle import ScanCycle
+
+
+def test_only_due_timers_expire():
+    scheduler = TimerScheduler()
+    timers = [Timer(name=f"T{i+1}", scheduler=scheduler) for i in range(1000)]
+    timers[10].start(3)
+    timers[500].start(5)
+    assert scheduler.advance(2) == []
+    assert timers[10].remaining_time == 1
+    assert scheduler.advance(1) == [timers[10]]
+    assert timers[10].triggered and not timers[10].isActive
+    assert scheduler.next_expiry() == 5
+    assert scheduler.advance(2) == [timers[500]]
+    assert scheduler.next_expiry() is None
+
+
+def test_stopped_or_restarted_timer_does_not_fire_stale_expiry():
+    scheduler = TimerScheduler()
+    timer = Timer(scheduler=scheduler)
+    timer.start(2)
+    timer.isActive = False  # bobina desligada antes do fim
+    assert scheduler.advance(2) == []
+    assert not timer.triggered
+
+    timer.start(2)
+    scheduler.advance(1)
+    timer.start(4)  # reinício: a expiração anterior fica obsoleta
+    assert scheduler.advance(1) == []
+    assert scheduler.advance(3) == [timer]
+
+
+def test_scan_cycle_supports_more_than_32_timers():
+    cycle = ScanCycle(logical_structure=LogicalStructure([]), backend='resolved', timer_count=200)
+    cycle.user_program = ['TON150 = I1', 'O1 = TONO150']
+    cycle.timers['T150'].preset = 2
+    cycle.set_mode('RUN')
+    cycle.inputs = [True] + [False] * 7
+    outputs = []
+    for _ in range(4):
+        cycle.scan()
+        outputs.append(cycle.outputs[0])
+    assert outputs == [False, False, True, True]
+
+
+def test_toggling_coil_does_not_grow_the_heap():
+    cycle = ScanCycle(logical_structure=LogicalStructure([]), backend='resolved')
+    cycle.user_program = ['B1 = !B1', 'TON1 = B1', 'O1 = TONO1']
+    cycle.timers['T1'].preset = 36000
+    cycle.set_mode('RUN')
+    for _ in range(20000):
+        cycle.scan()
+    assert len(cycle.timer_scheduler) <= 2 * MIN_COMPACT_SIZE
+    assert cycle.outputs[0] is False
+
+
+def test_compaction_keeps_running_timers():
+    scheduler = TimerScheduler()
+    timers = [Timer(name=f"T{i+1}", scheduler=scheduler) for i in range(10)]
+    for timer in timers:
+        timer.start(50)
+    for _ in range(500):
+        timers[0].start(5)  # Reinícios deixam entradas obsoletas que a compactação remove
+    assert len(scheduler) <= 2 * MIN_COMPACT_SIZE
+    assert scheduler.advance(5) == [timers[0]]
+    assert sorted(timer.name for timer in scheduler.advance(45)) == sorted(timer.name for timer in timers[1:])